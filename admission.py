@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+K-Beauty Admission Control
+Global in-flight cap and per-client token buckets for POST /mcp and WebSocket frames
+"""
+
+import contextlib
+import json
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+# 요청 비용 (토큰) - 사진 분석처럼 무거운 도구가 더 많이 소모
+TOOL_COSTS: Dict[str, float] = {
+    "analyze_skin_from_photo": 5.0,
+    "product_comparison": 2.0,
+    "skin_concern_matcher": 2.0,
+}
+DEFAULT_TOOL_COST = 1.0
+METHOD_COSTS: Dict[str, float] = {
+    "initialize": 0.2,
+    "tools/list": 0.2,
+    "ping": 0.1,
+}
+DEFAULT_METHOD_COST = 1.0
+
+# 비용 계산을 위해 읽는 최대 본문 크기
+MAX_BODY_BYTES = 1024 * 1024
+
+# JSON-RPC 서버 정의 오류 코드
+RATE_LIMITED = -32000
+OVERLOADED = -32002
+
+# 앞단 프록시 수 (Cloud Run/Railway = 1) - 각 프록시는 X-Forwarded-For 끝에 접속 주소를 덧붙이므로
+# 오른쪽에서 이 위치의 주소가 실제 클라이언트. 0이면 헤더를 무시하고 소켓 주소 사용
+TRUSTED_PROXY_HOPS = int(os.environ.get("KBEAUTY_TRUSTED_PROXY_HOPS", "0"))
+
+
+def client_key(scope: Dict[str, Any], trusted_hops: Optional[int] = None) -> str:
+    """Rate-limit identity of a request: the client address seen by the first trusted proxy
+
+    The left part of X-Forwarded-For (and any API key) is chosen by the
+    client, so it is never used; with ``trusted_hops`` proxies in front,
+    the entry that many places from the right was written by our own edge.
+    """
+    hops = TRUSTED_PROXY_HOPS if trusted_hops is None else trusted_hops
+    if hops > 0:
+        forwarded = [
+            value
+            for name, value in scope.get("headers") or ()
+            if name == b"x-forwarded-for"
+        ]
+        addresses = [part.strip() for part in b",".join(forwarded).split(b",") if part.strip()]
+        if len(addresses) >= hops:
+            return "ip:" + addresses[-hops].decode("latin-1")
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "unknown")
+
+
+def request_cost(message: Any) -> float:
+    """Token cost of one JSON-RPC message"""
+    if not isinstance(message, dict):
+        return DEFAULT_METHOD_COST
+    method = message.get("method")
+    if method == "tools/call":
+        params = message.get("params")
+        name = params.get("name") if isinstance(params, dict) else None
+        return TOOL_COSTS.get(name, DEFAULT_TOOL_COST)
+    return METHOD_COSTS.get(method, DEFAULT_METHOD_COST)
+
+
+class TokenBuckets:
+    """Per-client token buckets with O(1) state per active client
+
+    Buckets live in an LRU-ordered dict; clients idle for ``idle_ttl``
+    seconds are evicted (a bucket idle that long is full again anyway,
+    as long as ``idle_ttl >= burst / rate``). At most ``max_clients``
+    buckets are kept; beyond that the least recently used is dropped.
+    """
+
+    def __init__(self, rate: float, burst: float, idle_ttl: float = 300.0,
+                 max_clients: int = 10000, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.idle_ttl = max(idle_ttl, burst / rate)
+        self.max_clients = max_clients
+        self.clock = clock
+        # client -> [tokens, last_refill]
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _evict_idle(self, now: float) -> None:
+        buckets = self._buckets
+        while buckets:
+            client, bucket = next(iter(buckets.items()))
+            if now - bucket[1] < self.idle_ttl:
+                break
+            del buckets[client]
+
+    def acquire(self, client: str, cost: float) -> float:
+        """Take ``cost`` tokens; returns 0 on success or seconds until it would succeed"""
+        now = self.clock()
+        self._evict_idle(now)
+
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            if len(self._buckets) >= self.max_clients:
+                self._buckets.popitem(last=False)
+            bucket = self._buckets[client] = [self.burst, now]
+        else:
+            self._buckets.move_to_end(client)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+
+        cost = min(cost, self.burst)
+        if bucket[0] >= cost:
+            bucket[0] -= cost
+            return 0.0
+        return (cost - bucket[0]) / self.rate
+
+
+class AdmissionController:
+    """Per-worker admission state shared by every transport
+
+    * ``max_in_flight`` bounds concurrent calls per worker (503 / -32002)
+    * per-client token buckets keyed on the client address (429 / -32000)
+    * calls are weighted by JSON-RPC method / tool (``request_cost``)
+
+    POST /mcp is checked by ``AdmissionControlMiddleware``; WebSocket
+    frames are checked one call at a time against the same state.
+    """
+
+    def __init__(self, max_in_flight: int = 64, rate: float = 10.0, burst: float = 20.0,
+                 idle_ttl: float = 300.0, max_clients: int = 10000):
+        self.max_in_flight = max_in_flight
+        self.buckets = TokenBuckets(rate, burst, idle_ttl, max_clients)
+        self.in_flight = 0
+        self.rejected = {"overloaded": 0, "rate_limited": 0}
+
+    @classmethod
+    def options_from_env(cls) -> Dict[str, float]:
+        return {
+            "max_in_flight": int(os.environ.get("KBEAUTY_MAX_IN_FLIGHT", "64")),
+            "rate": float(os.environ.get("KBEAUTY_RATE_LIMIT", "10")),
+            "burst": float(os.environ.get("KBEAUTY_RATE_BURST", "20")),
+            "idle_ttl": float(os.environ.get("KBEAUTY_CLIENT_IDLE_TTL", "300")),
+            "max_clients": int(os.environ.get("KBEAUTY_MAX_CLIENTS", "10000")),
+        }
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        return cls(**cls.options_from_env())
+
+    def overloaded(self) -> bool:
+        """True (and counted) when the worker is at its in-flight cap"""
+        if self.in_flight >= self.max_in_flight:
+            self.rejected["overloaded"] += 1
+            return True
+        return False
+
+    def rate_limit(self, client: str, message: Any) -> float:
+        """Charge ``client`` for ``message``; 0 if admitted, else seconds to wait"""
+        retry_after = self.buckets.acquire(client, request_cost(message))
+        if retry_after:
+            self.rejected["rate_limited"] += 1
+        return retry_after
+
+    @contextlib.contextmanager
+    def admitted(self) -> Iterator[None]:
+        """Count an admitted call toward the in-flight cap while it runs"""
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "clients": len(self.buckets),
+            "rejected": dict(self.rejected),
+        }
+
+
+class AdmissionControlMiddleware:
+    """Rejects excess POST requests fast, before they reach the app
+
+    Uses ``controller`` (or a private one built from the keyword options)
+    for the in-flight cap and token buckets. Rejections carry
+    ``Retry-After`` and a JSON-RPC error body.
+    """
+
+    def __init__(self, app, paths: Tuple[str, ...] = ("/mcp",),
+                 controller: Optional[AdmissionController] = None, **options: Any):
+        self.app = app
+        self.paths = paths
+        self.controller = controller if controller is not None else AdmissionController(**options)
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or scope.get("method") != "POST"
+                or scope.get("path") not in self.paths):
+            await self.app(scope, receive, send)
+            return
+
+        controller = self.controller
+        if controller.overloaded():
+            await self._reject(send, 503, 1, OVERLOADED, "Server overloaded", None)
+            return
+
+        body, receive = await self._buffer_body(receive)
+        message = None
+        if body is not None:
+            try:
+                message = json.loads(body)
+            except ValueError:
+                pass
+
+        retry_after = controller.rate_limit(client_key(scope), message)
+        if retry_after:
+            request_id = message.get("id") if isinstance(message, dict) else None
+            await self._reject(send, 429, retry_after, RATE_LIMITED, "Rate limit exceeded", request_id)
+            return
+
+        with controller.admitted():
+            await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _buffer_body(receive) -> Tuple[Optional[bytes], Callable]:
+        """Read the request body and return a receive() that replays it"""
+        chunks = []
+        size = 0
+        messages = []
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                break
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            chunks.append(chunk)
+            if not message.get("more_body") or size > MAX_BODY_BYTES:
+                break
+
+        async def replay():
+            if messages:
+                return messages.pop(0)
+            return await receive()
+
+        body = b"".join(chunks) if size <= MAX_BODY_BYTES else None
+        return body, replay
+
+    @staticmethod
+    async def _reject(send, status: int, retry_after: float, code: int, message: str,
+                      request_id: Any) -> None:
+        body = json.dumps({
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "error": {"code": code, "message": message},
+        }).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
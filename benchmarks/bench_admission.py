@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Admission control load test
+Well-behaved client latency while one client floods POST /mcp, with and without admission control
+
+    python benchmarks/bench_admission.py --duration 10 --flood-concurrency 256
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 비교를 위해 앱은 미들웨어 없이 만들고 여기서 직접 감쌈
+os.environ["KBEAUTY_ADMISSION"] = "off"
+
+import http_server  # noqa: E402
+from admission import AdmissionControlMiddleware, AdmissionController  # noqa: E402
+
+PHOTO_CALL = {"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+              "params": {"name": "analyze_skin_from_photo", "arguments": {"image_description": "load"}}}
+ROUTINE_CALL = {"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+                "params": {"name": "recommend_routine", "arguments": {"skin_type": "dry"}}}
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def asgi_post(app, payload: bytes, address: str) -> int:
+    """Drive one POST /mcp from ``address`` through the ASGI app in-process and return the status"""
+    sent = False
+    status = 0
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        await asyncio.sleep(3600)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": "/mcp", "raw_path": b"/mcp",
+        "root_path": "", "query_string": b"", "client": (address, 1234),
+        "server": ("bench", 80),
+        "headers": [(b"content-type", b"application/json"),
+                    (b"content-length", str(len(payload)).encode())],
+    }
+    await app(scope, receive, send)
+    return status
+
+
+async def run(app, duration, flood_concurrency, good_clients, good_interval):
+    deadline = time.perf_counter() + duration
+    flood_payload = json.dumps(PHOTO_CALL).encode()
+    good_payload = json.dumps(ROUTINE_CALL).encode()
+    good_latencies = []
+    statuses = {"flood": {}, "good": {}}
+
+    async def flooder():
+        while time.perf_counter() < deadline:
+            status = await asgi_post(app, flood_payload, "10.0.0.1")
+            statuses["flood"][status] = statuses["flood"].get(status, 0) + 1
+            if status != 200:
+                # 거절된 클라이언트는 곧바로 재시도 (최악의 에이전트 루프)
+                await asyncio.sleep(0)
+
+    async def good_client(n):
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            # 버킷은 클라이언트 주소로 구분되므로 클라이언트마다 다른 주소
+            status = await asgi_post(app, good_payload, f"10.0.1.{n + 1}")
+            good_latencies.append(time.perf_counter() - start)
+            statuses["good"][status] = statuses["good"].get(status, 0) + 1
+            await asyncio.sleep(good_interval)
+
+    await asyncio.gather(*(flooder() for _ in range(flood_concurrency)),
+                         *(good_client(n) for n in range(good_clients)))
+    return good_latencies, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--flood-concurrency", type=int, default=256)
+    parser.add_argument("--good-clients", type=int, default=8)
+    parser.add_argument("--good-interval", type=float, default=0.05)
+    args = parser.parse_args()
+
+    variants = {
+        "no admission control": http_server.app,
+        "admission control": AdmissionControlMiddleware(
+            http_server.app, controller=AdmissionController.from_env()
+        ),
+    }
+    for label, app in variants.items():
+        latencies, statuses = asyncio.run(
+            run(app, args.duration, args.flood_concurrency, args.good_clients, args.good_interval)
+        )
+        print(f"[{label}]")
+        print(f"  good clients: n={len(latencies)} "
+              f"p50={statistics.median(latencies) * 1000:.1f}ms "
+              f"p99={percentile(latencies, 0.99) * 1000:.1f}ms statuses={statuses['good']}")
+        print(f"  flooder statuses: {statuses['flood']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Catalog snapshot benchmark
+Import throughput and load time of a catalog snapshot vs. parsing the CSV at startup
+
+    python benchmarks/bench_catalog_snapshot.py --rows 1000000
+"""
+
+import argparse
+import csv
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog_snapshot import CatalogSnapshot, import_catalog, iter_csv  # noqa: E402
+
+BRANDS = ["COSRX", "이니스프리", "라네즈", "설화수", "닥터자르트", "조선미녀", "아누아", "토리든",
+          "라운드랩", "스킨1004", "클리오", "페리페라", "마녀공장", "코스알엑스", "에뛰드"]
+CATEGORIES = ["cleanser", "toner", "essence", "serum", "ampoule", "moisturizer", "sunscreen",
+              "mask", "eye cream", "cushion"]
+INGREDIENTS = ["niacinamide", "centella", "hyaluronic acid", "snail mucin", "retinol",
+               "vitamin c", "ceramide", "rice", "green tea", "propolis", "mugwort", "panthenol"]
+COLUMNS = [("brand", "str"), ("name", "str"), ("category", "str"), ("ingredients", "str"),
+           ("price", "int32"), ("rating", "float32"), ("reviews", "int32")]
+
+
+def write_csv(path, rows, seed=7):
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([name for name, _ in COLUMNS])
+        for i in range(rows):
+            brand = rng.choice(BRANDS)
+            category = rng.choice(CATEGORIES)
+            writer.writerow([
+                brand, f"{brand} {category} {i % 5000}", category,
+                ";".join(rng.sample(INGREDIENTS, 3)),
+                rng.randrange(5000, 80000, 100), round(rng.uniform(3.0, 5.0), 1),
+                rng.randrange(0, 20000),
+            ])
+
+
+def max_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "catalog.csv")
+        snapshot_path = os.path.join(tmp, "catalog.snap")
+        write_csv(source, args.rows)
+        print(f"rows={args.rows:,} csv={os.path.getsize(source) / 1e6:.1f}MB")
+
+        rss_before = max_rss_mb()
+        start = time.perf_counter()
+        rows = import_catalog(source, snapshot_path, COLUMNS)
+        elapsed = time.perf_counter() - start
+        print(f"import: {rows / elapsed:>10,.0f} rows/s ({elapsed:.2f}s)  "
+              f"snapshot={os.path.getsize(snapshot_path) / 1e6:.1f}MB  "
+              f"peak RSS +{max_rss_mb() - rss_before:.0f}MB")
+
+        # 비교 기준: 기동 시 CSV 전체를 파싱해 메모리에 올리는 방식
+        start = time.perf_counter()
+        parsed = list(iter_csv(source))
+        print(f"load (parse CSV):      {(time.perf_counter() - start) * 1000:>9.1f}ms")
+        del parsed
+
+        start = time.perf_counter()
+        catalog = CatalogSnapshot(snapshot_path)
+        first = catalog.row(0)
+        print(f"load (mmap snapshot):  {(time.perf_counter() - start) * 1000:>9.3f}ms  "
+              f"first row={first['brand']}/{first['category']}")
+
+        rng = random.Random(1)
+        indexes = [rng.randrange(rows) for _ in range(args.lookups)]
+        start = time.perf_counter()
+        for index in indexes:
+            catalog.row(index)
+        elapsed = time.perf_counter() - start
+        print(f"random row reads:      {elapsed / args.lookups * 1e6:>9.2f}us/row")
+
+        start = time.perf_counter()
+        matches = catalog.find("brand", "조선미녀")
+        print(f"find(brand) postings:  {(time.perf_counter() - start) * 1000:>9.1f}ms "
+              f"({len(matches):,} rows)")
+        catalog.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Cold start benchmark
+Time from process spawn to the first health check, readiness and first tools/call response
+
+    python benchmarks/bench_cold_start.py --runs 5
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIRST_CALL = json.dumps({
+    "jsonrpc": "2.0", "id": 1, "method": "tools/call",
+    "params": {"name": "recommend_routine", "arguments": {"skin_type": "normal"}},
+})
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def request(port, method, path, body=None, timeout=5.0):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+    try:
+        headers = {"Content-Type": "application/json"} if body else {}
+        connection.request(method, path, body=body, headers=headers)
+        response = connection.getresponse()
+        return response.status, response.read()
+    finally:
+        connection.close()
+
+
+def poll(port, path, started, deadline, process):
+    """Seconds from spawn until ``path`` first answers 200"""
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("server exited during startup")
+        try:
+            status, _ = request(port, "GET", path, timeout=1.0)
+            if status == 200:
+                return time.perf_counter() - started
+        except OSError:
+            pass
+        time.sleep(0.002)
+    raise RuntimeError(f"{path} not ready in time")
+
+
+def cold_start(prewarm: bool, timeout: float = 30.0):
+    port = free_port()
+    env = dict(os.environ, KBEAUTY_PREWARM="on" if prewarm else "off",
+               KBEAUTY_ADMISSION="off", KBEAUTY_RELOAD_INTERVAL="0")
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "http_server:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+    try:
+        deadline = started + timeout
+        health = poll(port, "/", started, deadline, process)
+        ready = poll(port, "/ready", started, deadline, process)
+        call_start = time.perf_counter()
+        status, _ = request(port, "POST", "/mcp", FIRST_CALL)
+        first_call = time.perf_counter() - call_start
+        if status != 200:
+            raise RuntimeError(f"first tools/call returned {status}")
+        _, body = request(port, "GET", "/ready")
+        phases = json.loads(body)["phases"]
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return health, ready, first_call, phases
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    for prewarm in (False, True):
+        results = [cold_start(prewarm) for _ in range(args.runs)]
+        median = lambda index: statistics.median(result[index] for result in results) * 1000
+        phases = {name: statistics.median(result[3].get(name, 0.0) for result in results)
+                  for name in results[0][3]}
+        print(f"[prewarm {'on' if prewarm else 'off'}] runs={args.runs}")
+        print(f"  spawn -> health_check (/):   {median(0):>8.1f}ms")
+        print(f"  spawn -> ready (/ready):     {median(1):>8.1f}ms")
+        print(f"  first tools/call latency:    {median(2):>8.2f}ms")
+        print("  phases: " + ", ".join(f"{name}={ms:.1f}ms" for name, ms in phases.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Profile store benchmark
+Concurrent profile reads/writes against a temporary SQLite (WAL) database
+
+    python benchmarks/bench_profile_store.py --clients 64 --ops 200 --write-ratio 0.2
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from profile_store import ProfileStore  # noqa: E402
+
+SKIN_TYPES = ["oily", "dry", "combination", "sensitive", "normal"]
+CONCERNS = ["acne", "aging", "pigmentation", "dryness", "sensitivity"]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def client(store, profiles, ops, write_ratio, latencies, rng):
+    for _ in range(ops):
+        profile_id = rng.choice(profiles)
+        start = time.perf_counter()
+        if rng.random() < write_ratio:
+            if rng.random() < 0.5:
+                await store.update_profile(
+                    profile_id,
+                    skin_type=rng.choice(SKIN_TYPES),
+                    skin_concerns=rng.sample(CONCERNS, 2),
+                )
+            else:
+                await store.add_photo_analysis(profile_id, [rng.choice(CONCERNS)], "benchmark")
+            latencies["write"].append(time.perf_counter() - start)
+        else:
+            if rng.random() < 0.8:
+                await store.get_profile(profile_id)
+            else:
+                await store.get_photo_history(profile_id)
+            latencies["read"].append(time.perf_counter() - start)
+
+
+async def run(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ProfileStore(os.path.join(tmp, "profiles.db"), pool_size=args.pool_size,
+                             batch_size=args.batch_size)
+        profiles = [f"profile-{i}" for i in range(args.profiles)]
+        for profile_id in profiles:
+            await store.update_profile(profile_id, skin_type="normal", budget="mixed")
+        await store.flush()
+
+        latencies = {"read": [], "write": []}
+        rng = random.Random(42)
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            client(store, profiles, args.ops, args.write_ratio, latencies, random.Random(rng.random()))
+            for _ in range(args.clients)
+        ))
+        await store.flush()
+        elapsed = time.perf_counter() - start
+        await store.close()
+
+    total = args.clients * args.ops
+    print(f"clients={args.clients} ops={total} pool={args.pool_size} batch={args.batch_size}")
+    print(f"throughput: {total / elapsed:,.0f} ops/s ({elapsed:.2f}s)")
+    for kind, values in latencies.items():
+        if values:
+            print(f"{kind:>5}: n={len(values):>6} "
+                  f"p50={statistics.median(values) * 1000:.3f}ms "
+                  f"p99={percentile(values, 0.99) * 1000:.3f}ms "
+                  f"max={max(values) * 1000:.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=64, help="concurrent clients")
+    parser.add_argument("--ops", type=int, default=200, help="operations per client")
+    parser.add_argument("--profiles", type=int, default=1000, help="distinct profile ids")
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=64)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+stdio concurrency benchmark
+Throughput and latency of the concurrent stdio transport over in-memory streams
+
+    python benchmarks/bench_stdio_concurrency.py --requests 2000 --io-latency-ms 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import server  # noqa: E402
+
+TOOL_CALLS = [
+    ("analyze_skin_from_photo", {"image_description": "benchmark", "analysis_focus": ["pores", "acne"]}),
+    ("recommend_routine", {"skin_type": "oily", "skin_concerns": ["acne"], "budget": "mid-range"}),
+    ("skin_concern_matcher", {"concerns": ["acne", "dryness"], "severity": "mild"}),
+    ("seasonal_skincare_guide", {"season": "winter", "skin_type": "dry"}),
+    ("analyze_ingredients", {"ingredients": ["niacinamide", "retinol"], "skin_type": "sensitive"}),
+]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def run(outstanding, total, io_latency, max_concurrency):
+    async def call_tool(name, arguments):
+        # 실제 배포에서의 I/O 대기(프로필/인덱스 조회 등)를 흉내냄
+        if io_latency:
+            await asyncio.sleep(io_latency)
+        return await server.call_tool(name, arguments)
+
+    stdio = server.ConcurrentStdioServer(server.list_tools, call_tool, "bench", "0",
+                                         max_concurrency=max_concurrency)
+    to_server: asyncio.Queue = asyncio.Queue()
+    to_client: asyncio.Queue = asyncio.Queue()
+
+    async def read_line():
+        return await to_server.get()
+
+    async def write_line(data):
+        to_client.put_nowait(data)
+
+    serving = asyncio.create_task(stdio.serve(read_line, write_line))
+    sent_at = {}
+    latencies = []
+    next_id = 0
+
+    def send():
+        nonlocal next_id
+        name, arguments = TOOL_CALLS[next_id % len(TOOL_CALLS)]
+        message = {"jsonrpc": "2.0", "id": next_id, "method": "tools/call",
+                   "params": {"name": name, "arguments": arguments}}
+        sent_at[next_id] = time.perf_counter()
+        to_server.put_nowait(json.dumps(message).encode() + b"\n")
+        next_id += 1
+
+    start = time.perf_counter()
+    for _ in range(min(outstanding, total)):
+        send()
+    while len(latencies) < total:
+        response = json.loads(await to_client.get())
+        latencies.append(time.perf_counter() - sent_at.pop(response["id"]))
+        if next_id < total:
+            send()
+    elapsed = time.perf_counter() - start
+
+    to_server.put_nowait(b"")
+    await serving
+    return total / elapsed, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--io-latency-ms", type=float, default=5.0,
+                        help="simulated I/O wait per tool call")
+    parser.add_argument("--max-concurrency", type=int, default=64)
+    parser.add_argument("--outstanding", type=int, nargs="+", default=[1, 8, 64])
+    args = parser.parse_args()
+
+    print(f"requests={args.requests} io_latency={args.io_latency_ms}ms "
+          f"max_concurrency={args.max_concurrency}")
+    for outstanding in args.outstanding:
+        throughput, latencies = asyncio.run(
+            run(outstanding, args.requests, args.io_latency_ms / 1000, args.max_concurrency)
+        )
+        print(f"outstanding={outstanding:>3}: {throughput:>8,.0f} req/s  "
+              f"p50={statistics.median(latencies) * 1000:.2f}ms  "
+              f"p99={percentile(latencies, 0.99) * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
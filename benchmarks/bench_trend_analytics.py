@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Trend analytics benchmark
+Per-event update cost and memory of the heavy-hitter sketches
+
+    python benchmarks/bench_trend_analytics.py --events 2000000
+"""
+
+import argparse
+import itertools
+import os
+import random
+import resource
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trend_analytics import TrendTracker  # noqa: E402
+
+
+def zipf_vocabulary(prefix, size, rng):
+    """Skewed vocabulary so a few items dominate, like real traffic"""
+    items = [f"{prefix}-{i}" for i in range(size)]
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(size)))
+    return lambda: rng.choices(items, cum_weights=cum_weights, k=1)[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--vocabulary", type=int, default=50_000, help="distinct items per category")
+    parser.add_argument("--days", type=int, default=14, help="spread events over this many days")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    brand = zipf_vocabulary("brand", args.vocabulary, rng)
+    ingredient = zipf_vocabulary("ingredient", args.vocabulary, rng)
+    concern = zipf_vocabulary("concern", 200, rng)
+
+    # 이벤트 생성 비용은 측정에서 제외
+    events = [
+        {"brand_name": brand(), "ingredients": [ingredient(), ingredient()], "concerns": [concern()]}
+        for _ in range(min(args.events, 200_000))
+    ]
+    clients = [f"ip:10.0.{i // 256}.{i % 256}" for i in range(1000)]
+    start_ts = 1_700_000_000.0
+    step = args.days * 86400 / args.events
+
+    tracemalloc.start()
+    tracker = TrendTracker()
+    footprint, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # 추적 오버헤드 없이 갱신 비용만 측정
+    start = time.perf_counter()
+    for n in range(args.events):
+        tracker.observe(events[n % len(events)], now=start_ts + n * step, client=clients[n % len(clients)])
+    elapsed = time.perf_counter() - start
+    rss_growth = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+
+    now = start_ts + args.events * step
+    print(f"events: {args.events:,} ({args.days} days, 4 items/event)")
+    print(f"update: {elapsed / args.events * 1e6:.2f} us/event, {args.events / elapsed:,.0f} events/s")
+    print(f"memory: tracker {footprint / 1024:.0f} KiB at start "
+          f"(counters {tracker.nbytes / 1024:.0f} KiB), max RSS growth during run {rss_growth} KiB")
+
+    start = time.perf_counter()
+    top = tracker.top("brands", now=now)
+    rising = tracker.rising("ingredients", now=now)
+    print(f"query: {(time.perf_counter() - start) * 1000:.2f} ms (top + rising)")
+    print("top brands:", ", ".join(f"{item}={count}" for item, count in top))
+    print("rising ingredients:", ", ".join(f"{item}={count}/{before}" for item, count, before in rising))
+
+
+if __name__ == "__main__":
+    main()
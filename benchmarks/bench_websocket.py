@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+WebSocket transport benchmark
+tools/call throughput and latency over one multiplexed WebSocket vs. keep-alive POST /mcp
+
+    python benchmarks/bench_websocket.py --duration 10 --outstanding 1 16 64
+
+Needs the ``websockets`` client package (installed with uvicorn[standard]).
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import websockets
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TOOL_CALLS = [
+    ("recommend_routine", {"skin_type": "oily", "skin_concerns": ["acne"], "budget": "mid-range"}),
+    ("analyze_ingredients", {"ingredients": ["niacinamide", "retinol"], "skin_type": "sensitive"}),
+    ("kbeauty_trends", {"trend_type": "ingredients"}),
+    ("search_kbeauty_brands", {"brand_name": "COSRX"}),
+]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def call_message(request_id):
+    name, arguments = TOOL_CALLS[request_id % len(TOOL_CALLS)]
+    return {"jsonrpc": "2.0", "id": request_id, "method": "tools/call",
+            "params": {"name": name, "arguments": arguments}}
+
+
+async def read_response(reader) -> int:
+    status_line = await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return int(status_line.split()[1])
+
+
+async def http_load(port, outstanding, duration):
+    """One keep-alive connection per outstanding call"""
+    deadline = time.perf_counter() + duration
+    latencies = []
+    ids = itertools.count()
+
+    async def client():
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            while time.perf_counter() < deadline:
+                body = json.dumps(call_message(next(ids))).encode()
+                start = time.perf_counter()
+                writer.write(b"POST /mcp HTTP/1.1\r\nHost: 127.0.0.1\r\nContent-Type: application/json\r\n"
+                             b"Content-Length: %d\r\n\r\n" % len(body) + body)
+                if await read_response(reader) == 200:
+                    latencies.append(time.perf_counter() - start)
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(outstanding)))
+    return len(latencies) / (time.perf_counter() - start), latencies
+
+
+async def websocket_load(port, outstanding, duration):
+    """One WebSocket with ``outstanding`` calls in flight, matched by id"""
+    deadline = time.perf_counter() + duration
+    latencies = []
+    ids = itertools.count()
+    sent_at = {}
+
+    async with websockets.connect(f"ws://127.0.0.1:{port}/mcp/ws", subprotocols=["mcp"],
+                                  max_size=None) as ws:
+        async def send_one():
+            request_id = next(ids)
+            sent_at[request_id] = time.perf_counter()
+            await ws.send(json.dumps(call_message(request_id)))
+
+        start = time.perf_counter()
+        for _ in range(outstanding):
+            await send_one()
+        while sent_at:
+            response = json.loads(await ws.recv())
+            latencies.append(time.perf_counter() - sent_at.pop(response["id"]))
+            if time.perf_counter() < deadline:
+                await send_one()
+        return len(latencies) / (time.perf_counter() - start), latencies
+
+
+def wait_until_up(port, process, timeout=30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("server exited during startup")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("server did not start in time")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--outstanding", type=int, nargs="+", default=[1, 16, 64])
+    args = parser.parse_args()
+
+    port = free_port()
+    env = dict(os.environ, KBEAUTY_ADMISSION="off", KBEAUTY_WS_MAX_IN_FLIGHT=str(max(args.outstanding)))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "http_server:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+    try:
+        wait_until_up(port, process)
+        asyncio.run(http_load(port, 4, 1.0))  # 워밍업
+        for outstanding in args.outstanding:
+            for label, load in (("http", http_load), ("websocket", websocket_load)):
+                throughput, latencies = asyncio.run(load(port, outstanding, args.duration))
+                print(f"{label:>9} outstanding={outstanding:>3}: {throughput:>8,.0f} calls/s  "
+                      f"p50={statistics.median(latencies) * 1000:.2f}ms  "
+                      f"p99={percentile(latencies, 0.99) * 1000:.2f}ms")
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
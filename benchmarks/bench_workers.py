@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Worker scaling benchmark
+POST /mcp throughput of the gunicorn launcher with 1 to 8 workers
+
+    python benchmarks/bench_workers.py --workers 1 2 4 8 --duration 10 --connections 64
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TOOL_CALLS = [
+    ("analyze_skin_from_photo", {"image_description": "benchmark", "analysis_focus": ["pores", "acne"]}),
+    ("recommend_routine", {"skin_type": "oily", "skin_concerns": ["acne"], "budget": "mid-range"}),
+    ("skin_concern_matcher", {"concerns": ["acne", "dryness"], "severity": "mild"}),
+    ("kbeauty_trends", {"trend_type": "ingredients"}),
+    ("analyze_ingredients", {"ingredients": ["niacinamide", "retinol"], "skin_type": "sensitive"}),
+]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def build_requests(port):
+    requests = []
+    for n, (name, arguments) in enumerate(TOOL_CALLS):
+        body = json.dumps({"jsonrpc": "2.0", "id": n, "method": "tools/call",
+                           "params": {"name": name, "arguments": arguments}}).encode()
+        requests.append(
+            b"POST /mcp HTTP/1.1\r\nHost: 127.0.0.1:%d\r\nContent-Type: application/json\r\n"
+            b"Content-Length: %d\r\n\r\n" % (port, len(body)) + body
+        )
+    return requests
+
+
+async def read_response(reader) -> int:
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("server closed the connection")
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return int(status_line.split()[1])
+
+
+async def drive(port, connections, duration):
+    """Keep-alive HTTP/1.1 clients, one request outstanding per connection"""
+    requests = build_requests(port)
+    deadline = time.perf_counter() + duration
+    latencies = []
+    errors = 0
+
+    async def client(n):
+        nonlocal errors
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        i = n
+        try:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                writer.write(requests[i % len(requests)])
+                if await read_response(reader) == 200:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors += 1
+                i += 1
+        finally:
+            writer.close()
+
+    await asyncio.gather(*(client(n) for n in range(connections)))
+    return latencies, errors
+
+
+def client_process(args):
+    port, connections, duration = args
+    return asyncio.run(drive(port, connections, duration))
+
+
+def wait_until_up(port, process, timeout=30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("gunicorn exited during startup")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("gunicorn did not start in time")
+
+
+def run(workers, connections, duration, client_processes):
+    port = free_port()
+    env = dict(os.environ, PORT=str(port), WEB_CONCURRENCY=str(workers),
+               KBEAUTY_ADMISSION="off", KBEAUTY_LOG_LEVEL="warning")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--bind", f"127.0.0.1:{port}",
+         "http_server:app"],
+        cwd=ROOT, env=env,
+    )
+    try:
+        wait_until_up(port, process)
+        # 워커가 모두 뜰 때까지 잠깐 대기 후 워밍업
+        time.sleep(1.0)
+        client_process((port, min(connections, 8), 1.0))
+
+        per_process = max(1, connections // client_processes)
+        with multiprocessing.Pool(client_processes) as pool:
+            start = time.perf_counter()
+            results = pool.map(client_process, [(port, per_process, duration)] * client_processes)
+            elapsed = time.perf_counter() - start
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=60)
+
+    latencies = [latency for result, _ in results for latency in result]
+    errors = sum(errors for _, errors in results)
+    return len(latencies) / elapsed, latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--client-processes", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="load generator processes (so the client is not the bottleneck)")
+    args = parser.parse_args()
+
+    print(f"connections={args.connections} duration={args.duration}s "
+          f"client_processes={args.client_processes} cpus={os.cpu_count()}")
+    baseline = None
+    for workers in args.workers:
+        throughput, latencies, errors = run(workers, args.connections, args.duration,
+                                            args.client_processes)
+        baseline = baseline or throughput / workers
+        print(f"workers={workers}: {throughput:>8,.0f} req/s  "
+              f"scaling={throughput / (baseline * workers):.0%}  "
+              f"p50={statistics.median(latencies) * 1000:.2f}ms  "
+              f"p99={percentile(latencies, 0.99) * 1000:.2f}ms  errors={errors}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Traffic replay
+Open-loop replay of a KBEAUTY_RECORD_PATH capture against POST /mcp, with per-tool latency
+
+    python benchmarks/replay_traffic.py capture.jsonl --url http://127.0.0.1:8080 --speed 1
+    python benchmarks/replay_traffic.py capture.jsonl --url http://127.0.0.1:8080 --speed 10
+    python benchmarks/replay_traffic.py capture.jsonl --url http://127.0.0.1:8080 --rate 500
+
+Requests are sent at their scheduled times whether or not earlier ones
+have finished (open loop), and latency is measured from the scheduled
+time, so a slow server shows up as latency instead of a lower send rate.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import statistics
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urlsplit
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def load_capture(path: str) -> List[Tuple[float, Dict[str, Any]]]:
+    """(timestamp, message) pairs sorted by time"""
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            entries.append((record["ts"], {"method": record["method"], "params": record.get("params") or {}}))
+    entries.sort(key=lambda entry: entry[0])
+    return entries
+
+
+def schedule(entries, speed: float, rate: float, limit: int) -> List[Tuple[float, Dict[str, Any]]]:
+    """Offsets (seconds from start) at which each message is sent"""
+    if limit:
+        entries = entries[:limit]
+    if rate:
+        return [(n / rate, message) for n, (_, message) in enumerate(entries)]
+    start = entries[0][0] if entries else 0.0
+    return [((ts - start) / speed, message) for ts, message in entries]
+
+
+def label(message: Dict[str, Any]) -> str:
+    if message["method"] == "tools/call":
+        return str(message["params"].get("name"))
+    return message["method"]
+
+
+class ConnectionPool:
+    """Keep-alive HTTP/1.1 connections, opened on demand (open loop needs many)"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self.opened = 0
+
+    async def post(self, path: str, body: bytes) -> int:
+        if self.idle:
+            reader, writer = self.idle.pop()
+        else:
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+            self.opened += 1
+        try:
+            writer.write(b"POST %s HTTP/1.1\r\nHost: %s\r\nContent-Type: application/json\r\n"
+                         b"Content-Length: %d\r\n\r\n" % (path.encode(), self.host.encode(), len(body)) + body)
+            status_line = await reader.readline()
+            if not status_line:
+                raise ConnectionError("connection closed")
+            length = 0
+            keep_alive = True
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                name, _, value = line.partition(b":")
+                name = name.strip().lower()
+                if name == b"content-length":
+                    length = int(value)
+                elif name == b"connection" and value.strip().lower() == b"close":
+                    keep_alive = False
+            await reader.readexactly(length)
+        except BaseException:
+            writer.close()
+            raise
+        if keep_alive:
+            self.idle.append((reader, writer))
+        else:
+            writer.close()
+        return int(status_line.split()[1])
+
+    def close(self) -> None:
+        for _, writer in self.idle:
+            writer.close()
+
+
+async def replay(url: str, plan, timeout: float):
+    parts = urlsplit(url)
+    pool = ConnectionPool(parts.hostname or "127.0.0.1", parts.port or 80)
+    path = (parts.path.rstrip("/") or "") + "/mcp"
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    statuses: Dict[str, Dict[Any, int]] = defaultdict(lambda: defaultdict(int))
+    ids = itertools.count(1)
+    lateness = []
+
+    async def send(scheduled: float, message: Dict[str, Any]) -> None:
+        body = json.dumps({"jsonrpc": "2.0", "id": next(ids), **message}, ensure_ascii=False).encode("utf-8")
+        name = label(message)
+        try:
+            status = await asyncio.wait_for(pool.post(path, body), timeout)
+        except asyncio.TimeoutError:
+            status = "timeout"
+        except (OSError, asyncio.IncompleteReadError, ValueError, IndexError) as e:
+            # 끊긴 연결이나 깨진 응답(상태 줄, Content-Length)은 오류 상태로만 셈
+            status = type(e).__name__
+        statuses[name][status] += 1
+        if status == 200:
+            latencies[name].append(time.perf_counter() - scheduled)
+
+    tasks = []
+    start = time.perf_counter()
+    for offset, message in plan:
+        scheduled = start + offset
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        lateness.append(time.perf_counter() - scheduled)
+        tasks.append(asyncio.create_task(send(scheduled, message)))
+    # 예상 못 한 예외가 나도 나머지 재생은 계속
+    for result in await asyncio.gather(*tasks, return_exceptions=True):
+        if isinstance(result, Exception):
+            statuses["(replay)"][type(result).__name__] += 1
+    elapsed = time.perf_counter() - start
+    pool.close()
+    return latencies, statuses, lateness, elapsed, pool.opened
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("capture", help="JSONL written by the recorder (KBEAUTY_RECORD_PATH)")
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay at N x recorded speed")
+    parser.add_argument("--rate", type=float, default=0.0,
+                        help="ignore timestamps and send at a fixed rate (requests/s)")
+    parser.add_argument("--limit", type=int, default=0, help="replay only the first N requests")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    plan = schedule(load_capture(args.capture), args.speed, args.rate, args.limit)
+    if not plan:
+        parser.error("capture is empty")
+    mode = f"rate={args.rate:g}/s" if args.rate else f"speed={args.speed:g}x"
+    print(f"replaying {len(plan):,} requests over {plan[-1][0]:.1f}s ({mode}) against {args.url}")
+
+    latencies, statuses, lateness, elapsed, connections = asyncio.run(
+        replay(args.url, plan, args.timeout)
+    )
+    print(f"done in {elapsed:.1f}s: {len(plan) / elapsed:,.0f} req/s, {connections} connections, "
+          f"scheduler lateness p99={percentile(lateness, 0.99) * 1000:.2f}ms")
+    print(f"{'tool / method':<28}{'n':>8}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}  statuses")
+    for name in sorted(statuses):
+        values = latencies.get(name) or [float("nan")]
+        print(f"{name:<28}{len(latencies.get(name, [])):>8}"
+              f"{statistics.median(values) * 1000:>8.2f}ms{percentile(values, 0.9) * 1000:>8.2f}ms"
+              f"{percentile(values, 0.99) * 1000:>8.2f}ms{max(values) * 1000:>8.2f}ms  "
+              f"{dict(statuses[name])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+K-Beauty Buffered Writer
+Bounded, non-blocking buffer drained in batches by a daemon thread (spans, traffic capture)
+"""
+
+import atexit
+import collections
+import logging
+import os
+import threading
+from typing import Callable, Generic, List, Optional, TypeVar
+
+logger = logging.getLogger("k-beauty-mcp")
+
+T = TypeVar("T")
+
+
+class BufferedWriter(Generic[T]):
+    """Hands items from the request path to a background ``write(batch)``
+
+    ``put`` never blocks: once ``buffer_size`` items are queued new ones
+    are dropped and counted. A daemon thread (started on the first item)
+    writes batches of up to ``batch_size`` every ``interval`` seconds, or
+    sooner when a full batch is waiting, and ``flush`` runs once more at
+    exit. A batch whose ``write`` raises is counted as dropped. If the
+    writer cannot start (e.g. ``prepare`` cannot create an unwritable
+    output directory) it is disabled, logged once, and every item is
+    dropped from then on; ``put`` never raises into the request path.
+
+    Forked children start with an empty buffer and no thread: the parent's
+    thread does not exist in the child and its lock may have been held at
+    fork time; items still buffered belong to the parent, which writes them.
+    """
+
+    def __init__(self, write: Callable[[List[T]], None], name: str, buffer_size: int = 8192,
+                 batch_size: int = 512, interval: float = 1.0,
+                 prepare: Optional[Callable[[], None]] = None):
+        self.write = write
+        self.name = name
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.interval = interval
+        # 스레드를 처음 시작할 때 한 번 (출력 디렉터리 생성 등)
+        self.prepare = prepare
+        self.written = 0
+        self.dropped = 0
+        self.disabled = False
+
+        self._atexit_registered = False
+        self._after_fork()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self) -> None:
+        self._buffer: "collections.deque[T]" = collections.deque()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    @property
+    def full(self) -> bool:
+        return len(self._buffer) >= self.buffer_size
+
+    def put(self, item: T) -> bool:
+        """Queue ``item``; False (and counted as dropped) if full or disabled"""
+        if self.disabled or len(self._buffer) >= self.buffer_size:
+            self.dropped += 1
+            return False
+        self._buffer.append(item)
+        if self._thread is None:
+            self._start()
+            return not self.disabled
+        elif len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def _start(self) -> None:
+        with self._thread_lock:
+            if self._thread is None and not self.disabled:
+                try:
+                    if self.prepare is not None:
+                        self.prepare()
+                    thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+                    thread.start()
+                except Exception as e:
+                    # 출력 위치를 쓸 수 없으면 요청을 실패시키지 않고 기록만 멈춤
+                    self.disabled = True
+                    self.dropped += len(self._buffer)
+                    self._buffer.clear()
+                    logger.warning("%s disabled, dropping all items: %s: %s",
+                                   self.name, type(e).__name__, e)
+                    return
+                self._thread = thread
+                if not self._atexit_registered:
+                    self._atexit_registered = True
+                    atexit.register(self.flush)
+
+    def _loop(self) -> None:
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def _drain(self) -> List[T]:
+        batch = []
+        buffer = self._buffer
+        while buffer and len(batch) < self.batch_size:
+            batch.append(buffer.popleft())
+        return batch
+
+    def flush(self) -> None:
+        """Write every buffered item (called by the thread, or at shutdown)"""
+        while True:
+            batch = self._drain()
+            if not batch:
+                return
+            try:
+                self.write(batch)
+                self.written += len(batch)
+            except Exception:
+                # 기록 스레드가 죽지 않도록 어떤 오류든 배치만 버림
+                self.dropped += len(batch)
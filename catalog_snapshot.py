@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+K-Beauty Catalog Snapshot
+Streaming CSV/JSONL catalog import into a compact, memory-mapped binary snapshot
+
+    python catalog_snapshot.py products.csv catalog.snap --column brand:str \\
+        --column name:str --column category:str --column price:int --column rating:float
+
+Snapshot layout (native byte order, recorded in the header; sections 8-byte aligned)::
+
+    magic "KBCSNAP1" | u32 header length | JSON header
+    column 0 .. column N-1      fixed-width arrays, one value per row
+    string offsets              u64[count + 1] into the string data
+    postings (per str column)   u64[count + 1] starts, u32[rows] row indexes
+    string data                 UTF-8, strings sorted so lookups can bisect
+
+String columns store u32 ids into the shared, interned string table.
+Each string column also gets a posting index (rows grouped by string id),
+so ``find`` is a bisect plus a slice instead of a column scan.
+Opening a snapshot parses only the header; columns are memoryviews over
+one read-only mmap, so workers forked from the same master (or separate
+processes opening the same file) share the page cache.
+"""
+
+import argparse
+import array
+import csv
+import json
+import mmap
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+MAGIC = b"KBCSNAP1"
+FORMAT_VERSION = 2
+# 버전 1 스냅숏(포스팅 인덱스 없음)도 읽을 수 있음 - find는 컬럼 전체를 훑음
+READABLE_VERSIONS = (1, 2)
+
+# 컬럼 타입 -> array/memoryview 타입 코드 (고정 폭)
+COLUMN_TYPES: Dict[str, str] = {
+    "str": "I",      # 문자열 테이블 id
+    "int": "q",
+    "int32": "i",
+    "float": "d",
+    "float32": "f",
+}
+
+# 컬럼별 임시 파일로 내보내는 단위 (행)
+SPOOL_ROWS = 65536
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _convert(value: Any, column_type: str) -> Any:
+    if column_type in ("int", "int32"):
+        if value in (None, ""):
+            return 0
+        return int(float(value)) if isinstance(value, str) and "." in value else int(value)
+    if column_type in ("float", "float32"):
+        return float("nan") if value in (None, "") else float(value)
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        # 성분 목록 등은 ';'로 이어 하나의 문자열로 저장
+        return ";".join(str(item) for item in value)
+    return str(value)
+
+
+def iter_csv(path: str, encoding: str = "utf-8-sig") -> Iterator[Dict[str, Any]]:
+    """Rows of a CSV file with a header line, read incrementally"""
+    with open(path, newline="", encoding=encoding) as f:
+        yield from csv.DictReader(f)
+
+
+def iter_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    """Objects of a JSON Lines file, read incrementally (blank lines skipped)"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def iter_records(path: str) -> Iterator[Dict[str, Any]]:
+    if path.endswith((".jsonl", ".ndjson")):
+        return iter_jsonl(path)
+    return iter_csv(path)
+
+
+class SnapshotWriter:
+    """Builds a snapshot from a stream of rows in bounded memory
+
+    Column values are buffered in typed arrays and spilled to per-column
+    temporary files every ``SPOOL_ROWS`` rows; only the interned string
+    table (one copy of each distinct string) stays in memory.
+    """
+
+    def __init__(self, path: str, columns: Sequence[Tuple[str, str]]):
+        for name, column_type in columns:
+            if column_type not in COLUMN_TYPES:
+                raise ValueError(f"Unsupported column type for {name!r}: {column_type}")
+        self.path = path
+        self.columns = list(columns)
+        self.rows = 0
+        self._strings: Dict[str, int] = {}
+        self._directory = tempfile.mkdtemp(prefix="kbeauty-snapshot-",
+                                           dir=os.path.dirname(os.path.abspath(path)))
+        self._buffers = [array.array(COLUMN_TYPES[t]) for _, t in self.columns]
+        self._spools = [open(os.path.join(self._directory, f"column-{i}"), "wb")
+                        for i in range(len(self.columns))]
+
+    def intern(self, value: str) -> int:
+        string_id = self._strings.get(value)
+        if string_id is None:
+            string_id = self._strings[value] = len(self._strings)
+        return string_id
+
+    def add(self, record: Dict[str, Any]) -> None:
+        intern = self.intern
+        for (name, column_type), buffer in zip(self.columns, self._buffers):
+            value = _convert(record.get(name), column_type)
+            buffer.append(intern(value) if column_type == "str" else value)
+        self.rows += 1
+        if len(self._buffers[0]) >= SPOOL_ROWS:
+            self._spill()
+
+    def extend(self, records: Iterable[Dict[str, Any]]) -> int:
+        for record in records:
+            self.add(record)
+        return self.rows
+
+    def _spill(self) -> None:
+        for buffer, spool in zip(self._buffers, self._spools):
+            buffer.tofile(spool)
+            del buffer[:]
+
+    def close(self) -> None:
+        """Write the snapshot (atomically replacing ``path``) and remove temp files"""
+        self._spill()
+        for spool in self._spools:
+            spool.close()
+        try:
+            self._write()
+        finally:
+            for i in range(len(self.columns)):
+                os.unlink(os.path.join(self._directory, f"column-{i}"))
+            os.rmdir(self._directory)
+
+    def _write(self) -> None:
+        # 문자열을 정렬해 id를 다시 매기면 조회 시 이진 탐색 가능
+        ordered = sorted(self._strings, key=lambda s: s.encode("utf-8"))
+        remap = array.array("I", bytes(4 * len(ordered)))
+        for new_id, value in enumerate(ordered):
+            remap[self._strings[value]] = new_id
+        encoded = [value.encode("utf-8") for value in ordered]
+        string_offsets = array.array("Q", [0])
+        total = 0
+        for data in encoded:
+            total += len(data)
+            string_offsets.append(total)
+
+        header: Dict[str, Any] = {
+            "version": FORMAT_VERSION,
+            "byteorder": sys.byteorder,
+            "rows": self.rows,
+            "columns": [],
+            "strings": {"count": len(ordered)},
+            "created": int(time.time()),
+        }
+        # 섹션 오프셋이 헤더 길이에 달려 있으므로 길이가 안정될 때까지 반복
+        base = 0
+        while True:
+            offset = base
+            header["columns"] = []
+            for name, column_type in self.columns:
+                header["columns"].append({"name": name, "type": column_type, "offset": offset})
+                offset = _align(offset + self.rows * array.array(COLUMN_TYPES[column_type]).itemsize)
+            header["strings"]["offsets"] = offset
+            offset = _align(offset + string_offsets.itemsize * len(string_offsets))
+            for column in header["columns"]:
+                if column["type"] == "str":
+                    column["postings"] = offset
+                    offset = _align(offset + 8 * (len(ordered) + 1) + 4 * self.rows)
+            header["strings"]["data"] = offset
+            header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+            needed = _align(len(MAGIC) + 4 + len(header_bytes))
+            if needed <= base:
+                break
+            base = needed
+        header_bytes = header_bytes.ljust(base - len(MAGIC) - 4)
+
+        temporary = self.path + ".tmp"
+        with open(temporary, "wb") as out:
+            out.write(MAGIC + len(header_bytes).to_bytes(4, "little") + header_bytes)
+            for i, (name, column_type) in enumerate(self.columns):
+                self._pad(out)
+                self._copy_column(out, i, column_type, remap)
+            self._pad(out)
+            string_offsets.tofile(out)
+            for i, (name, column_type) in enumerate(self.columns):
+                if column_type == "str":
+                    self._pad(out)
+                    starts, rows = self._postings(i, len(ordered), remap)
+                    starts.tofile(out)
+                    rows.tofile(out)
+            self._pad(out)
+            for data in encoded:
+                out.write(data)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(temporary, self.path)
+
+    @staticmethod
+    def _pad(out) -> None:
+        position = out.tell()
+        out.write(b"\0" * (_align(position) - position))
+
+    def _chunks(self, index: int, column_type: str, remap: array.array) -> Iterator[array.array]:
+        """Spooled values of one column (string ids already renumbered)"""
+        typecode = COLUMN_TYPES[column_type]
+        with open(os.path.join(self._directory, f"column-{index}"), "rb") as spool:
+            while True:
+                chunk = array.array(typecode)
+                data = spool.read(SPOOL_ROWS * chunk.itemsize)
+                if not data:
+                    break
+                chunk.frombytes(data)
+                if column_type == "str":
+                    chunk = array.array(typecode, [remap[string_id] for string_id in chunk])
+                yield chunk
+
+    def _copy_column(self, out, index: int, column_type: str, remap: array.array) -> None:
+        for chunk in self._chunks(index, column_type, remap):
+            chunk.tofile(out)
+
+    def _postings(self, index: int, string_count: int,
+                  remap: array.array) -> Tuple[array.array, array.array]:
+        """Counting sort of row indexes by string id: (starts[count + 1], rows)"""
+        starts = array.array("Q", bytes(8 * (string_count + 1)))
+        for chunk in self._chunks(index, "str", remap):
+            for string_id in chunk:
+                starts[string_id + 1] += 1
+        for string_id in range(string_count):
+            starts[string_id + 1] += starts[string_id]
+
+        # 포스팅 목록만 메모리에 둠 (행당 4바이트)
+        rows = array.array("I", bytes(4 * self.rows))
+        cursor = array.array("Q", starts)
+        row = 0
+        for chunk in self._chunks(index, "str", remap):
+            for string_id in chunk:
+                rows[cursor[string_id]] = row
+                cursor[string_id] += 1
+                row += 1
+        return starts, rows
+
+    def __enter__(self) -> "SnapshotWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+            return
+        for spool in self._spools:
+            spool.close()
+        for i in range(len(self.columns)):
+            try:
+                os.unlink(os.path.join(self._directory, f"column-{i}"))
+            except OSError:
+                pass
+        os.rmdir(self._directory)
+
+
+class StringColumn:
+    """Row-indexed view of a string column (decodes on access)"""
+
+    __slots__ = ("ids", "_snapshot")
+
+    def __init__(self, ids: memoryview, snapshot: "CatalogSnapshot"):
+        self.ids = ids
+        self._snapshot = snapshot
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, row: int) -> str:
+        return self._snapshot.string(self.ids[row])
+
+
+class CatalogSnapshot:
+    """Read-only catalog backed by an mmap of a snapshot file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        if view[:len(MAGIC)] != MAGIC:
+            view.release()
+            self._mmap.close()
+            raise ValueError(f"Not a catalog snapshot: {path}")
+        header_length = int.from_bytes(view[len(MAGIC):len(MAGIC) + 4], "little")
+        start = len(MAGIC) + 4
+        header = json.loads(bytes(view[start:start + header_length]))
+        if header["version"] not in READABLE_VERSIONS or header["byteorder"] != sys.byteorder:
+            view.release()
+            self._mmap.close()
+            raise ValueError(f"Incompatible catalog snapshot: {path}")
+
+        self.header = header
+        self.rows: int = header["rows"]
+        self._view = view
+        self._columns: Dict[str, Any] = {}
+        self._postings: Dict[str, Tuple[memoryview, memoryview]] = {}
+        self.column_types: Dict[str, str] = {}
+        for column in header["columns"]:
+            typecode = COLUMN_TYPES[column["type"]]
+            size = self.rows * array.array(typecode).itemsize
+            values = view[column["offset"]:column["offset"] + size].cast(typecode)
+            self.column_types[column["name"]] = column["type"]
+            self._columns[column["name"]] = (StringColumn(values, self)
+                                             if column["type"] == "str" else values)
+
+        strings = header["strings"]
+        self.string_count: int = strings["count"]
+        for column in header["columns"]:
+            if "postings" in column:
+                starts = column["postings"]
+                rows = starts + 8 * (self.string_count + 1)
+                self._postings[column["name"]] = (view[starts:rows].cast("Q"),
+                                                  view[rows:rows + 4 * self.rows].cast("I"))
+        self._string_offsets = view[strings["offsets"]:strings["offsets"] + 8 * (self.string_count + 1)].cast("Q")
+        self._string_data = strings["data"]
+
+    def __len__(self) -> int:
+        return self.rows
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    def column(self, name: str) -> Any:
+        """memoryview of numbers, or a StringColumn"""
+        return self._columns[name]
+
+    def string(self, string_id: int) -> str:
+        start = self._string_data + self._string_offsets[string_id]
+        end = self._string_data + self._string_offsets[string_id + 1]
+        return str(self._view[start:end], "utf-8")
+
+    def _string_bytes(self, string_id: int) -> bytes:
+        start = self._string_data + self._string_offsets[string_id]
+        return self._mmap[start:self._string_data + self._string_offsets[string_id + 1]]
+
+    def string_id(self, value: str) -> Optional[int]:
+        """Id of an interned string (binary search over the sorted table)"""
+        target = value.encode("utf-8")
+        low, high = 0, self.string_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._string_bytes(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.string_count and self._string_bytes(low) == target:
+            return low
+        return None
+
+    def row(self, index: int) -> Dict[str, Any]:
+        if not 0 <= index < self.rows:
+            raise IndexError(index)
+        return {name: values[index] for name, values in self._columns.items()}
+
+    def find(self, column: str, value: str, limit: Optional[int] = None) -> List[int]:
+        """Row indexes (ascending) whose string ``column`` equals ``value``
+
+        O(log strings + matches) through the posting index; snapshots
+        written before the index existed fall back to a column scan.
+        """
+        string_id = self.string_id(value)
+        if string_id is None:
+            return []
+        postings = self._postings.get(column)
+        if postings is not None:
+            starts, rows = postings
+            start, end = starts[string_id], starts[string_id + 1]
+            if limit is not None:
+                end = min(end, start + limit)
+            return rows[start:end].tolist()
+        ids = self._columns[column].ids
+        rows = []
+        for index, row_id in enumerate(ids):
+            if row_id == string_id:
+                rows.append(index)
+                if limit is not None and len(rows) >= limit:
+                    break
+        return rows
+
+    def close(self) -> None:
+        for values in self._columns.values():
+            (values.ids if isinstance(values, StringColumn) else values).release()
+        for starts, rows in self._postings.values():
+            starts.release()
+            rows.release()
+        self._string_offsets.release()
+        self._view.release()
+        self._mmap.close()
+
+    def __enter__(self) -> "CatalogSnapshot":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def import_catalog(source: str, path: str, columns: Sequence[Tuple[str, str]]) -> int:
+    """Stream a CSV/JSONL dump into a snapshot; returns the row count"""
+    with SnapshotWriter(path, columns) as writer:
+        return writer.extend(iter_records(source))
+
+
+def load_catalog(path: Optional[str] = None) -> Optional[CatalogSnapshot]:
+    """Open the snapshot at ``path`` or ``KBEAUTY_CATALOG_SNAPSHOT`` (None if unset)"""
+    path = path or os.environ.get("KBEAUTY_CATALOG_SNAPSHOT")
+    if not path:
+        return None
+    return CatalogSnapshot(path)
+
+
+def parse_column(spec: str) -> Tuple[str, str]:
+    name, _, column_type = spec.partition(":")
+    return name, column_type or "str"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import a CSV/JSONL catalog into a snapshot")
+    parser.add_argument("source", help="CSV (with header) or .jsonl file")
+    parser.add_argument("snapshot", help="output snapshot path")
+    parser.add_argument("--column", action="append", required=True, type=parse_column,
+                        help="name[:type], type one of " + ", ".join(COLUMN_TYPES))
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rows = import_catalog(args.source, args.snapshot, args.column)
+    elapsed = time.perf_counter() - start
+    print(f"{rows:,} rows -> {args.snapshot} ({os.path.getsize(args.snapshot):,} bytes) "
+          f"in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+K-Beauty Response Compression
+Content-Encoding negotiation and precompressed constant JSON-RPC payloads
+"""
+
+import importlib
+import importlib.util
+import json
+import os
+import struct
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# 이 크기보다 작은 응답은 압축하지 않음
+MIN_COMPRESS_BYTES = int(os.environ.get("KBEAUTY_COMPRESS_MIN_BYTES", "1024"))
+
+# 선택 의존성 (인코딩 이름 -> 모듈). 기동 시간을 줄이려고 설치 여부만 확인하고
+# 실제 import는 처음 그 인코딩으로 압축할 때 함
+_OPTIONAL_CODECS = {"zstd": "zstandard", "br": "brotli"}
+_codec_modules: Dict[str, Any] = {}
+
+# 서버 선호 순서 (설치된 인코딩만)
+AVAILABLE_ENCODINGS = tuple(
+    encoding for encoding in ("zstd", "br") if importlib.util.find_spec(_OPTIONAL_CODECS[encoding])
+) + ("gzip",)
+
+# 사전 압축 페이로드는 id만 바꿔 붙일 수 있는 gzip으로 제공
+PRECOMPRESSED_ENCODINGS = ("gzip",)
+
+# mtime 0, OS unknown
+_GZIP_HEADER = b"\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff"
+
+
+def negotiate(accept_encoding: Optional[str], available: Tuple[str, ...] = AVAILABLE_ENCODINGS) -> Optional[str]:
+    """Pick a content-coding from an Accept-Encoding header (None = identity)"""
+    if not accept_encoding:
+        return None
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compress a dynamic response body"""
+    if encoding == "gzip":
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        return compressor.compress(data) + compressor.flush()
+    if encoding == "br":
+        return _codec("br").compress(data, quality=5)
+    if encoding == "zstd":
+        return _codec("zstd").ZstdCompressor(level=3).compress(data)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def _codec(encoding: str) -> Any:
+    module = _codec_modules.get(encoding)
+    if module is None:
+        module = _codec_modules[encoding] = importlib.import_module(_OPTIONAL_CODECS[encoding])
+    return module
+
+
+def encode_body(data: bytes, accept_encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+    """Compress ``data`` if it is large enough and the client accepts an encoding"""
+    if len(data) < MIN_COMPRESS_BYTES:
+        return data, None
+    encoding = negotiate(accept_encoding)
+    if encoding is None:
+        return data, None
+    return compress(data, encoding), encoding
+
+
+def dumps(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class PrecompressedJSON:
+    """JSON-RPC result body compressed once, with only the id filled in per request
+
+    The body is ``{"jsonrpc":"2.0","result":<result>,"id":<id>}``. Everything
+    up to the id is deflated once and sync-flushed to a byte boundary; each
+    response appends the id as a stored (uncompressed) final deflate block
+    plus the gzip trailer, so a hit does no compression work.
+    """
+
+    __slots__ = ("result", "_prefix", "_gzip_prefix", "_crc")
+
+    def __init__(self, result: Any):
+        self.result = result
+        self._prefix = b'{"jsonrpc":"2.0","result":' + dumps(result) + b',"id":'
+        self._crc = zlib.crc32(self._prefix)
+        if len(self._prefix) >= MIN_COMPRESS_BYTES:
+            compressor = zlib.compressobj(9, zlib.DEFLATED, -15)
+            self._gzip_prefix = (_GZIP_HEADER + compressor.compress(self._prefix)
+                                 + compressor.flush(zlib.Z_SYNC_FLUSH))
+        else:
+            self._gzip_prefix = None
+
+    def __len__(self) -> int:
+        return len(self._prefix)
+
+    def body(self, request_id: Any, accept_encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+        """Response body for ``request_id`` and the content-coding used"""
+        tail = dumps(request_id) + b"}"
+        if (self._gzip_prefix is not None and len(tail) <= 0xFFFF
+                and negotiate(accept_encoding, PRECOMPRESSED_ENCODINGS) == "gzip"):
+            size = len(self._prefix) + len(tail)
+            return (
+                self._gzip_prefix
+                + b"\x01" + struct.pack("<HH", len(tail), len(tail) ^ 0xFFFF) + tail
+                + struct.pack("<II", zlib.crc32(tail, self._crc), size & 0xFFFFFFFF),
+                "gzip",
+            )
+        return self._prefix + tail, None
+
+
+class PayloadCache:
+    """Bounded LRU cache of PrecompressedJSON payloads"""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, PrecompressedJSON]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[PrecompressedJSON]:
+        payload = self._entries.get(key)
+        if payload is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return payload
+
+    def put(self, key: Hashable, payload: PrecompressedJSON) -> None:
+        self._entries[key] = payload
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
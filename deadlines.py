@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+K-Beauty Deadlines
+Per-request and per-tool time budgets with cooperative cancellation checkpoints
+"""
+
+import asyncio
+import contextvars
+import os
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+# JSON-RPC 오류 코드 (MCP SDK의 REQUEST_TIMEOUT과 동일)
+REQUEST_TIMEOUT = -32001
+
+DEFAULT_REQUEST_TIMEOUT = float(os.environ.get("KBEAUTY_REQUEST_TIMEOUT", "30"))
+MAX_REQUEST_TIMEOUT = float(os.environ.get("KBEAUTY_MAX_REQUEST_TIMEOUT", "120"))
+
+# 도구별 실행 예산 (초)
+TOOL_BUDGETS: Dict[str, float] = {
+    "analyze_skin_from_photo": 20.0,
+    "search_kbeauty_brands": 5.0,
+    "recommend_routine": 5.0,
+    "analyze_ingredients": 5.0,
+    "product_comparison": 5.0,
+    "kbeauty_trends": 5.0,
+    "seasonal_skincare_guide": 5.0,
+    "dupes_finder": 5.0,
+    "skin_concern_matcher": 5.0,
+}
+DEFAULT_TOOL_BUDGET = 10.0
+
+# 도구 튜닝용 카운터 - 도구 이름은 클라이언트가 보내므로 TOOL_BUDGETS에 없는 이름은 하나로 묶음
+UNKNOWN_TOOL = "unknown"
+TOOL_CALLS: Counter = Counter()
+TOOL_TIMEOUTS: Counter = Counter()
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request or tool runs past its budget"""
+
+    def __init__(self, scope: str, budget: float):
+        super().__init__(f"{scope} exceeded its {budget:g}s budget")
+        self.scope = scope
+        self.budget = budget
+
+
+class RequestContext:
+    """Deadline carried through one request via a context variable"""
+
+    __slots__ = ("method", "deadline", "timeout")
+
+    def __init__(self, method: str, timeout: float):
+        self.method = method
+        self.timeout = timeout
+        self.deadline = time.monotonic() + timeout
+
+    def remaining(self) -> float:
+        return self.deadline - time.monotonic()
+
+    def check(self) -> None:
+        if self.remaining() <= 0:
+            raise DeadlineExceeded(self.method, self.timeout)
+
+
+_current_context: contextvars.ContextVar[Optional[RequestContext]] = contextvars.ContextVar(
+    "kbeauty_request_context", default=None
+)
+
+
+def current_context() -> Optional[RequestContext]:
+    return _current_context.get()
+
+
+def request_timeout(requested: Any = None) -> float:
+    """Clamp a client-supplied timeout (seconds) to the server maximum"""
+    try:
+        timeout = float(requested)
+    except (TypeError, ValueError):
+        return DEFAULT_REQUEST_TIMEOUT
+    if timeout <= 0:
+        return DEFAULT_REQUEST_TIMEOUT
+    return min(timeout, MAX_REQUEST_TIMEOUT)
+
+
+async def checkpoint() -> None:
+    """Cooperative cancellation point for long handlers
+
+    Raises DeadlineExceeded once the current request is past its deadline
+    and yields to the event loop so a pending cancellation is delivered.
+    """
+    context = _current_context.get()
+    if context is not None:
+        context.check()
+    await asyncio.sleep(0)
+
+
+async def run_request(method: str, timeout: float, handler: Callable[[], Awaitable[T]]) -> T:
+    """Run a whole request under its deadline"""
+    context = RequestContext(method, timeout)
+    token = _current_context.set(context)
+    try:
+        return await asyncio.wait_for(handler(), timeout)
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded(method, timeout) from None
+    finally:
+        _current_context.reset(token)
+
+
+async def run_tool(tool_name: str, handler: Callable[[], Awaitable[T]]) -> T:
+    """Run a tool under min(tool budget, remaining request time) and count overruns"""
+    budget = TOOL_BUDGETS.get(tool_name, DEFAULT_TOOL_BUDGET)
+    context = _current_context.get()
+    timeout = budget if context is None else min(budget, context.remaining())
+    counted = tool_name if tool_name in TOOL_BUDGETS else UNKNOWN_TOOL
+    TOOL_CALLS[counted] += 1
+    if timeout <= 0:
+        TOOL_TIMEOUTS[counted] += 1
+        raise DeadlineExceeded(context.method, context.timeout)
+    try:
+        return await asyncio.wait_for(handler(), timeout)
+    except asyncio.TimeoutError:
+        TOOL_TIMEOUTS[counted] += 1
+        if context is not None and context.remaining() <= 0:
+            raise DeadlineExceeded(context.method, context.timeout) from None
+        raise DeadlineExceeded(f"tool {tool_name}", budget) from None
+
+
+def timeout_stats() -> Dict[str, Dict[str, int]]:
+    """Per-tool call and timeout counts (names outside TOOL_BUDGETS under "unknown")"""
+    return {
+        tool: {"calls": calls, "timeouts": TOOL_TIMEOUTS.get(tool, 0)}
+        for tool, calls in sorted(TOOL_CALLS.items())
+    }
@@ -0,0 +1,69 @@
+"""
+K-Beauty Production Launcher
+gunicorn settings: N uvicorn workers sharing one preloaded copy of the app
+
+    gunicorn -c gunicorn.conf.py http_server:app
+
+The app module (tool schemas, templates, precompressed payloads and
+indexes) is imported once in the master and inherited copy-on-write by
+every worker. SIGHUP / SIGTERM restart or stop workers gracefully: each
+worker stops accepting, finishes in-flight requests within
+``graceful_timeout`` and then exits.
+"""
+
+import gc
+import math
+import os
+
+
+def available_cpus() -> int:
+    """CPUs this container may actually use (affinity mask and cgroup quota)"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    # Cloud Run / Docker --cpus 는 cgroup v2 cpu.max 로 제한됨 ("max 100000" = 무제한)
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return max(1, cpus)
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+# WEB_CONCURRENCY 로 직접 지정 가능 (기본: 사용 가능한 CPU당 1개)
+workers = int(os.environ.get("WEB_CONCURRENCY", "0")) or available_cpus()
+
+# 정적 테이블과 인덱스를 마스터에서 한 번만 만들고 fork로 공유
+preload_app = True
+
+# 재시작/종료 시 진행 중인 요청을 마칠 때까지 기다리는 시간 (초)
+graceful_timeout = int(os.environ.get("KBEAUTY_GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.environ.get("KBEAUTY_WORKER_TIMEOUT", "120"))
+keepalive = 5
+
+# 선택: N개 요청마다 워커를 순차 재시작 (메모리 단편화 대비, 0 = 끔)
+max_requests = int(os.environ.get("KBEAUTY_MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+
+accesslog = None
+errorlog = "-"
+loglevel = os.environ.get("KBEAUTY_LOG_LEVEL", "info")
+proc_name = "k-beauty-mcp"
+
+
+def when_ready(server):
+    server.log.info("K-Beauty MCP ready: %d workers (%d CPUs available)", workers, available_cpus())
+
+
+def pre_fork(server, worker):
+    # preload된 객체를 GC 추적 대상에서 빼서 워커의 GC가 공유 페이지를 건드리지 않게 함
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    server.log.info("Worker spawned (pid: %s)", worker.pid)
@@ -4,18 +4,46 @@ K-Beauty Remote MCP Server - Simplified HTTP Version
 Korean Beauty and Skincare Assistant with AI-Powered Analysis
 """
 
+import asyncio
 import json
+import logging
+import math
+import os
 import uuid
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Awaitable, Dict, List, Optional
 
-from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi import FastAPI, Request, HTTPException, WebSocket
+from fastapi.responses import StreamingResponse, JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
+
+from admission import OVERLOADED, RATE_LIMITED, AdmissionControlMiddleware, AdmissionController, client_key
+from catalog_snapshot import load_catalog
+from compression import PayloadCache, PrecompressedJSON, dumps, encode_body
+from deadlines import (
+    REQUEST_TIMEOUT, DeadlineExceeded, checkpoint, request_timeout, run_request, run_tool, timeout_stats,
+)
+from knowledge_base import KNOWLEDGE, LanguagePack
+from startup import STARTUP
+from tracing import SPAN_KIND_SERVER, tracer
+from traffic_recorder import TrafficRecorder, schema_enums
+from trend_analytics import TrendTracker
+from websocket_transport import CLOSE_MESSAGE_TOO_BIG, MessageTooLarge, WebSocketSession
+
+STARTUP.mark("imports")
+
+logger = logging.getLogger("k-beauty-mcp")
 
 app = FastAPI(title="K-Beauty Remote MCP Server", version="3.0.0")
 
+# 과부하 방지 (동시 처리 상한 + 클라이언트별 토큰 버킷) - CORS 안쪽에 두어 거절 응답에도 CORS 헤더 적용
+# POST /mcp(미들웨어)와 WebSocket 프레임이 같은 버킷과 동시 처리 한도를 공유
+ADMISSION: Optional[AdmissionController] = None
+if os.environ.get("KBEAUTY_ADMISSION", "on") != "off":
+    ADMISSION = AdmissionController.from_env()
+    app.add_middleware(AdmissionControlMiddleware, controller=ADMISSION)
+
 # CORS 설정
 app.add_middleware(
     CORSMiddleware,
@@ -36,6 +64,8 @@ class MCPResponse(BaseModel):
     id: Any
     result: Any = None
     error: Dict[str, Any] = None
+    # 미리 직렬화/압축된 result (있으면 응답 시 그대로 사용)
+    _payload: Any = PrivateAttr(default=None)
 
 # K-Beauty 도구 정의
 KBEAUTY_TOOLS = [
@@ -104,6 +134,11 @@ KBEAUTY_TOOLS = [
                     "type": "string",
                     "enum": ["budget", "mid-range", "luxury", "mixed"],
                     "description": "Budget preference"
+                },
+                "language": {
+                    "type": "string",
+                    "enum": ["ko", "en"],
+                    "description": "Response language (default: Accept-Language, then ko)"
                 }
             },
             "required": ["skin_type"]
@@ -164,6 +199,11 @@ KBEAUTY_TOOLS = [
                     "type": "string",
                     "enum": ["current", "2024", "2025", "emerging"],
                     "description": "Time period for trend analysis"
+                },
+                "language": {
+                    "type": "string",
+                    "enum": ["ko", "en"],
+                    "description": "Response language (default: Accept-Language, then ko)"
                 }
             },
             "required": ["trend_type"]
@@ -189,6 +229,11 @@ KBEAUTY_TOOLS = [
                     "type": "string",
                     "enum": ["humid", "dry", "temperate", "tropical"],
                     "description": "Local climate type"
+                },
+                "language": {
+                    "type": "string",
+                    "enum": ["ko", "en"],
+                    "description": "Response language (default: Accept-Language, then ko)"
                 }
             },
             "required": ["season", "skin_type"]
@@ -227,6 +272,11 @@ KBEAUTY_TOOLS = [
                     "type": "string",
                     "enum": ["mild", "moderate", "severe"],
                     "description": "Severity level of concerns"
+                },
+                "language": {
+                    "type": "string",
+                    "enum": ["ko", "en"],
+                    "description": "Response language (default: Accept-Language, then ko)"
                 }
             },
             "required": ["concerns"]
@@ -234,53 +284,225 @@ KBEAUTY_TOOLS = [
     }
 ]
 
+# 요청 트래픽 기반 트렌드 (원본 요청은 저장하지 않음) - 결과가 모든 사용자에게 노출되므로
+# 알려진 용어만, 여러 클라이언트가 요청한 항목만 집계
+TREND_TRACKER = TrendTracker(
+    min_clients=int(os.environ.get("KBEAUTY_TREND_MIN_CLIENTS", "3")),
+    is_known=lambda category, item: KNOWLEDGE.current.is_trend_term(category, item),
+)
+
+# 트래픽 캡처: 스키마 enum 값과 트렌드 어휘에 있는 용어만 원문으로 남김
+recorder = TrafficRecorder.from_env(
+    allowed_values=schema_enums(KBEAUTY_TOOLS),
+    tool_names=[tool["name"] for tool in KBEAUTY_TOOLS],
+    is_known=lambda category, term: KNOWLEDGE.current.is_trend_term(category, term),
+)
+
+def traffic_trends_section(trend_type: str, language: LanguagePack, min_events: int = 20) -> str:
+    """Render "rising this week" from the traffic sketches (empty if too little data)"""
+    with tracer.span("trends.lookup", trend_type=trend_type):
+        return _render_traffic_trends(trend_type, language, min_events)
+
+def _render_traffic_trends(trend_type: str, language: LanguagePack, min_events: int) -> str:
+    events = TREND_TRACKER.event_count()
+    if events < min_events:
+        return ""
+
+    labels = language.trend_categories
+    categories = [trend_type] if trend_type in labels else []
+    if "concerns" not in categories:
+        categories.append("concerns")
+
+    lines = [language.label("trend_header", {"events": f"{events:,}"}), ""]
+    for category in categories:
+        label = labels[category]
+        rising = TREND_TRACKER.rising(category)
+        top = TREND_TRACKER.top(category)
+        if rising:
+            lines.append(language.label("trend_rising", {"label": label}))
+            lines.extend(
+                language.label("trend_rising_item",
+                               {"item": item, "count": f"{count:,}", "previous": f"{previous:,}"})
+                for item, count, previous in rising
+            )
+            lines.append("")
+        if top:
+            lines.append(language.label("trend_top", {"label": label}))
+            lines.extend(language.label("trend_top_item", {"item": item, "count": f"{count:,}"})
+                         for item, count in top)
+            lines.append("")
+
+    if len(lines) == 2:
+        return ""
+    return "\n".join(lines) + "\n"
+
+# 상수 응답은 한 번만 직렬화/압축해 둠
+INITIALIZE_PAYLOAD = PrecompressedJSON({
+    "protocolVersion": "2024-11-05",
+    "capabilities": {
+        "tools": {}
+    },
+    "serverInfo": {
+        "name": "k-beauty-complete",
+        "version": "3.0.0"
+    }
+})
+TOOLS_LIST_PAYLOAD = PrecompressedJSON({"tools": KBEAUTY_TOOLS})
+
+# 같은 인자에 항상 같은 결과를 내는 도구의 결과 캐시 (kbeauty_trends는 트래픽에 따라 달라짐)
+UNCACHEABLE_TOOLS = {"kbeauty_trends"}
+TOOL_RESULT_CACHE = PayloadCache(maxsize=1024)
+MAX_CACHE_KEY_BYTES = 4096
+
+STARTUP.mark("tables")
+
+# 카탈로그 스냅숏은 import 시점(gunicorn preload면 fork 전)에 열어 워커가 매핑된 페이지를 공유
+CATALOG = load_catalog()
+if CATALOG is not None:
+    STARTUP.mark("catalog")
+
+def payload_response(request_id: Any, payload: PrecompressedJSON) -> MCPResponse:
+    response = MCPResponse(id=request_id, result=payload.result)
+    response._payload = payload
+    return response
+
+# 데이터가 새로 로드되면 이전 버전으로 만든 결과는 버림
+KNOWLEDGE.on_reload(lambda knowledge: TOOL_RESULT_CACHE.clear())
+
+def tool_cache_key(tool_name: Any, arguments: Dict[str, Any]):
+    if tool_name in UNCACHEABLE_TOOLS:
+        return None
+    try:
+        # 키에 데이터 버전을 넣어 리로드 중 실행된 요청이 새 캐시에 옛 결과를 넣지 않게 함
+        key = json.dumps([KNOWLEDGE.current.digest, tool_name, arguments],
+                         sort_keys=True, ensure_ascii=False)
+    except (TypeError, ValueError):
+        return None
+    return key if len(key) <= MAX_CACHE_KEY_BYTES else None
+
+# 언어별로 미리 렌더링된 응답이 있는 도구 - 언어는 항상 인자로 고정해 캐시 키에 포함
+LOCALIZED_TOOLS = {"recommend_routine", "skin_concern_matcher", "kbeauty_trends", "seasonal_skincare_guide"}
+
+def localize_arguments(tool_name: Any, arguments: Any, accept_language: Optional[str]) -> Any:
+    """Arguments with ``language`` resolved from the argument, then Accept-Language"""
+    if tool_name not in LOCALIZED_TOOLS or not isinstance(arguments, dict):
+        return arguments
+    requested = arguments.get("language")
+    language = KNOWLEDGE.current.language(requested if isinstance(requested, str) else accept_language)
+    if requested == language.language:
+        return arguments
+    return {**arguments, "language": language.language}
+
+@app.on_event("startup")
+async def start_knowledge_reload():
+    # 워커마다 데이터 파일 변경을 감시해 백그라운드에서 다시 로드
+    KNOWLEDGE.start_watching()
+
+@app.on_event("shutdown")
+async def stop_knowledge_reload():
+    KNOWLEDGE.stop_watching()
+
+# 기동 직후 한 번씩 실행해 두는 대표 호출 (KBEAUTY_PREWARM=on)
+PREWARM_CALLS = [
+    ("analyze_skin_from_photo", {}),
+    ("recommend_routine", {"skin_type": "normal", "language": "ko"}),
+    ("recommend_routine", {"skin_type": "normal", "language": "en"}),
+    ("analyze_ingredients", {"ingredients": []}),
+    ("kbeauty_trends", {"trend_type": "ingredients"}),
+]
+
+async def prewarm() -> None:
+    """Run the hot paths once: tool dispatch, result caching and response encoding"""
+    for payload in (INITIALIZE_PAYLOAD, TOOLS_LIST_PAYLOAD):
+        payload.body(0, "gzip")
+    for tool_name, arguments in PREWARM_CALLS:
+        # 트렌드 집계에 잡히지 않도록 observe 없이 호출
+        result = await call_tool_cached(tool_name, arguments)
+        if isinstance(result, PrecompressedJSON):
+            result.body(0, "gzip")
+        else:
+            encode_body(dumps(MCPResponse(id=0, result=result).dict()), "gzip")
+
+async def prewarm_then_ready() -> None:
+    try:
+        await prewarm()
+    except Exception as e:
+        # 프리웜이 실패한 워커는 /ready 503을 유지해 트래픽을 받지 않음
+        logger.exception("Prewarm failed; this worker stays unready")
+        STARTUP.mark_failed(e)
+        return
+    STARTUP.mark("prewarm")
+    STARTUP.mark_ready()
+
+_prewarm_task = None
+
+@app.on_event("startup")
+async def finish_startup():
+    global _prewarm_task
+    # 프리웜은 백그라운드에서 실행: 포트는 바로 열리고 /ready만 끝날 때까지 503
+    if os.environ.get("KBEAUTY_PREWARM", "off") == "on":
+        _prewarm_task = asyncio.get_running_loop().create_task(prewarm_then_ready())
+    else:
+        STARTUP.mark_ready()
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness: 200 once tables, payloads and (optional) prewarm are done"""
+    report = STARTUP.report()
+    if not report["ready"]:
+        status = "failed" if report["error"] else "starting"
+        return JSONResponse(status_code=503, content={"status": status, **report})
+    return {"status": "ready", "data_version": KNOWLEDGE.current.version, **report}
+
 @app.get("/")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "server": "k-beauty-remote-mcp", "version": "3.0.0"}
+    return {
+        "status": "healthy",
+        "server": "k-beauty-remote-mcp",
+        "version": "3.0.0",
+        "data": KNOWLEDGE.stats(),
+        "catalog": {"path": CATALOG.path, "rows": CATALOG.rows} if CATALOG is not None else None,
+        "tool_timeouts": timeout_stats(),
+        "admission": ADMISSION.stats() if ADMISSION is not None else None,
+    }
 
-async def handle_mcp_request(request: MCPRequest) -> MCPResponse:
-    """Handle MCP requests"""
+async def handle_mcp_request(request: MCPRequest, timeout: Any = None,
+                             accept_language: Optional[str] = None,
+                             client: Optional[str] = None) -> MCPResponse:
+    """Handle MCP requests under a per-request deadline (seconds)"""
+    try:
+        return await run_request(request.method, request_timeout(timeout),
+                                 lambda: _handle_mcp_request(request, accept_language, client))
+    except DeadlineExceeded as e:
+        return MCPResponse(
+            id=request.id,
+            error={
+                "code": REQUEST_TIMEOUT,
+                "message": f"Request timed out: {str(e)}"
+            }
+        )
+
+async def _handle_mcp_request(request: MCPRequest, accept_language: Optional[str] = None,
+                              client: Optional[str] = None) -> MCPResponse:
     try:
         if request.method == "initialize":
-            return MCPResponse(
-                id=request.id,
-                result={
-                    "protocolVersion": "2024-11-05",
-                    "capabilities": {
-                        "tools": {}
-                    },
-                    "serverInfo": {
-                        "name": "k-beauty-complete",
-                        "version": "3.0.0"
-                    }
-                }
-            )
+            return payload_response(request.id, INITIALIZE_PAYLOAD)
         
         elif request.method == "tools/list":
-            return MCPResponse(
-                id=request.id,
-                result={"tools": KBEAUTY_TOOLS}
-            )
+            return payload_response(request.id, TOOLS_LIST_PAYLOAD)
         
         elif request.method == "tools/call":
             tool_name = request.params.get("name")
             arguments = request.params.get("arguments", {})
+            with tracer.span("trends.observe"):
+                TREND_TRACKER.observe(arguments, client=client)
             
-            # K-Beauty 도구 실행 시뮬레이션
-            result = await execute_kbeauty_tool(tool_name, arguments)
-            
-            return MCPResponse(
-                id=request.id,
-                result={
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": result
-                        }
-                    ]
-                }
-            )
+            arguments = localize_arguments(tool_name, arguments, accept_language)
+            result = await call_tool_cached(tool_name, arguments)
+            if isinstance(result, PrecompressedJSON):
+                return payload_response(request.id, result)
+            return MCPResponse(id=request.id, result=result)
         
         else:
             return MCPResponse(
@@ -291,6 +513,8 @@ async def handle_mcp_request(request: MCPRequest) -> MCPResponse:
                 }
             )
             
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         return MCPResponse(
             id=request.id,
@@ -300,125 +524,189 @@ async def handle_mcp_request(request: MCPRequest) -> MCPResponse:
             }
         )
 
+async def call_tool_cached(tool_name: Any, arguments: Dict[str, Any]) -> Any:
+    """Tool result as a cached PrecompressedJSON, or a plain result if uncacheable"""
+    cache_key = tool_cache_key(tool_name, arguments)
+    if cache_key is not None:
+        payload = TOOL_RESULT_CACHE.get(cache_key)
+        if payload is not None:
+            return payload
+    
+    # K-Beauty 도구 실행 시뮬레이션
+    with tracer.span("tool.dispatch", tool=str(tool_name)):
+        result = await run_tool(str(tool_name), lambda: execute_kbeauty_tool(tool_name, arguments))
+    
+    result = {
+        "content": [
+            {
+                "type": "text",
+                "text": result
+            }
+        ]
+    }
+    if cache_key is None:
+        return result
+    
+    payload = PrecompressedJSON(result)
+    TOOL_RESULT_CACHE.put(cache_key, payload)
+    return payload
+
+def string_list(value: Any) -> List[str]:
+    """Array argument as a list of strings (a bare string is one item, like TrendTracker.observe)"""
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, list):
+        return [item for item in value if isinstance(item, str)]
+    return []
+
 async def execute_kbeauty_tool(tool_name: str, arguments: Dict[str, Any]) -> str:
     """Execute K-Beauty tools with mock responses"""
+    await checkpoint()
+    # 요청 하나는 처음 읽은 버전의 데이터만 사용
+    language = KNOWLEDGE.current.language(arguments.get("language"))
     
     if tool_name == "analyze_skin_from_photo":
-        return """🧴 AI 피부 분석 결과
-
-📸 이미지 분석:
-• 피부톤: 밝은 웜톤 (Warm Light)
-• 피부타입: 복합성 피부 (T존 지성, 볼 건성)
-• 주요 고민: 모공, 약간의 색소침착
-
-🎯 K-Beauty 추천:
-• 클렌징: 이니스프리 그린티 클렌징폼
-• 토너: 원더미라클 패치토너
-• 세럼: 더오디너리 니아신아마이드 10%
-• 보습: 라로슈포제 에파클라 듀오
-
-✨ 추천 루틴:
-아침: 순한 클렌징 → 토너 → 비타민C 세럼 → 선크림
-저녁: 더블 클렌징 → 토너 → 니아신아마이드 → 보습크림"""
+        return language.render_tool_text(tool_name)
 
     elif tool_name == "search_kbeauty_brands":
         brand = arguments.get("brand_name", "Unknown")
-        return f"""🏷️ {brand} 브랜드 정보
-
-📋 브랜드 개요:
-• 설립연도: 2013년
-• 본사: 영국 (K-Beauty 영향받은 글로벌 브랜드)
-• 특징: 합리적 가격의 효과적인 성분 중심
-
-🧪 주력 제품:
-• 니아신아마이드 10% + 징크 1%
-• 하이알루로닉애씨드 2% + B5
-• AHA 30% + BHA 2% 필링솔루션
-• 레티노이드 제품군
-
-💰 가격대: 1만-3만원 (매우 합리적)
-🌟 평점: 4.3/5.0 (글로벌 뷰티 커뮤니티)"""
+        return language.render_tool_text(tool_name, {"brand": str(brand)})
 
     elif tool_name == "recommend_routine":
         skin_type = arguments.get("skin_type", "normal")
-        return f"""🌟 {skin_type} 피부 맞춤 K-Beauty 루틴
-
-🌅 모닝 루틴:
-1. 클렌징: 코스알엑스 굿모닝 젤클렌저
-2. 토너: 토르든 히알루로닉애씨드 토너
-3. 세럼: 미샤 비타C 플러스 스팟 코렉팅&페이딩 세럼
-4. 보습: 토르든 세라마이드 크림
-5. 선크림: 뷰티오브조선 선크림
-
-🌙 이브닝 루틴:
-1. 클렌징오일: DHC 딥클렌징오일
-2. 폼클렌징: 세타필 젠틀 폼클렌저
-3. 토너: 토르든 히알루로닉애씨드 토너
-4. 세럼: 더오디너리 니아신아마이드 (주 3회)
-5. 보습: 일리윤 세라마이드 아토 로션
-
-💡 주간 스페셜 케어:
-• 화: BHA 각질케어 (토르든 살리실릭애씨드)
-• 금: 마스크팩 (메디힐 N.M.F 아쿠아링)"""
+        return language.routine_response(str(skin_type))
 
     elif tool_name == "analyze_ingredients":
-        ingredients = arguments.get("ingredients", [])
-        return f"""🧪 성분 분석 결과
-
-📊 분석된 성분: {', '.join(ingredients[:5])}
-
-🔬 주요 성분 효능:
-• 니아신아마이드: 모공 축소, 유수분 밸런스, 브라이트닝
-• 하이알루로닉애씨드: 강력한 보습, 수분 보유력 향상
-• 세라마이드: 피부장벽 강화, 수분 손실 방지
-
-⚠️ 주의사항:
-• 레티놀 + AHA/BHA 동시 사용 주의
-• 비타민C + 니아신아마이드 농도 확인 필요
-• 새로운 성분은 패치 테스트 권장
-
-💡 추천 조합:
-아침: 항산화제 (비타민C) + 선크림
-저녁: 각질케어 (AHA/BHA) or 레티놀 (번갈아 사용)"""
+        ingredients = string_list(arguments.get("ingredients"))
+        return language.render_tool_text(tool_name, {"ingredients": ', '.join(ingredients[:5])})
 
     elif tool_name == "kbeauty_trends":
-        return """📈 2024-2025 K-Beauty 트렌드
+        trend_type = arguments.get("trend_type", "ingredients")
+        await checkpoint()
+        return traffic_trends_section(trend_type, language) + language.render_tool_text(tool_name)
+
+    elif tool_name == "seasonal_skincare_guide":
+        guide = language.seasonal_guide(str(arguments.get("season")),
+                                         str(arguments.get("skin_type", "normal")),
+                                         str(arguments.get("climate", "temperate")))
+        if guide is not None:
+            return guide
+        return language.render_tool_text("default", {"tool_name": str(tool_name)})
+
+    elif tool_name == "skin_concern_matcher":
+        concerns = string_list(arguments.get("concerns"))
+        if not concerns:
+            return language.label("missing_concerns")
+        result = language.label("concern_title")
+        result += language.label("concern_list", {"concerns": ', '.join(concerns)})
+        result += language.label("concern_severity", {"severity": str(arguments.get("severity", "moderate"))})
+        for concern in concerns:
+            await checkpoint()
+            info = language.match_concern(concern)
+            if info is not None:
+                result += language.label("concern_heading", {"concern": concern.title()})
+                result += info["body"]
+        return result
 
-🔥 인기 성분:
-• 센텔라 아시아티카 (진정, 항염)
-• 스네일 세크리션 (재생, 보습)
-• 프로폴리스 (항균, 진정)
-• 글루타티온 (브라이트닝)
+    else:
+        return language.render_tool_text("default", {"tool_name": str(tool_name)})
 
-🌟 트렌드 제품:
-• 글래스 스킨 베이스 메이크업
-• 멀티 레이어링 보습 시스템
-• 개인 맞춤형 스킨케어
-• 친환경 패키징
+def encode_response(response: MCPResponse, accept_encoding: str, span: Any) -> Response:
+    """Serialize (or reuse a precompressed body) and negotiate Content-Encoding"""
+    payload = response._payload
+    if payload is not None:
+        body, encoding = payload.body(response.id, accept_encoding)
+    else:
+        body, encoding = encode_body(dumps(response.dict()), accept_encoding)
+    span.set_attribute("response.bytes", len(body))
+    
+    headers = {"Vary": "Accept-Encoding, Accept-Language"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
 
-💫 새로운 브랜드들:
-• 토르든 (Torriden)
-• 라운드랩 (Round Lab)
-• 미녹시딜 (Minoxidil) - 헤어케어
-• 퍼미들 (Purmild)
+# 클라이언트 연결 끊김 확인 주기 (초)
+DISCONNECT_POLL_INTERVAL = 0.25
 
-🎯 2025 전망:
-AI 기반 피부 분석, 개인 맞춤형 제품이 대세가 될 전망"""
+class ClientDisconnected(Exception):
+    """The HTTP client went away before the response was ready"""
 
-    else:
-        return f"K-Beauty 도구 '{tool_name}' 실행 완료! 자세한 분석을 위해 Claude에게 문의하세요."
+async def cancel_on_disconnect(request: Request, work: Awaitable[Any]) -> Any:
+    """Await ``work``, cancelling it if the client disconnects first"""
+    task = asyncio.ensure_future(work)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                raise ClientDisconnected()
+    finally:
+        if not task.done():
+            task.cancel()
 
 @app.post("/mcp")
-async def mcp_endpoint(request: MCPRequest):
+async def mcp_endpoint(request: Request):
     """Main MCP endpoint for HTTP requests"""
-    response = await handle_mcp_request(request)
-    return response.dict()
+    with tracer.span("POST /mcp", kind=SPAN_KIND_SERVER) as root:
+        with tracer.span("mcp.parse"):
+            try:
+                message = json.loads(await request.body())
+            except ValueError as e:
+                return JSONResponse(
+                    status_code=400,
+                    content={
+                        "jsonrpc": "2.0",
+                        "id": None,
+                        "error": {"code": -32700, "message": f"Parse error: {str(e)}"}
+                    }
+                )
+            # JSON은 맞지만 요청 형식이 아닌 경우 (method 누락 등)
+            try:
+                if not isinstance(message, dict):
+                    raise TypeError("request must be a JSON object")
+                mcp_request = MCPRequest(**message)
+            except (ValueError, TypeError) as e:
+                request_id = message.get("id") if isinstance(message, dict) else None
+                return JSONResponse(
+                    status_code=400,
+                    content={
+                        "jsonrpc": "2.0",
+                        "id": request_id if isinstance(request_id, (str, int, float)) else None,
+                        "error": {"code": -32600, "message": f"Invalid Request: {str(e)}"}
+                    }
+                )
+        root.set_attribute("rpc.method", mcp_request.method)
+        recorder.record(mcp_request.method, mcp_request.params, "http")
+        
+        with tracer.span("handle_mcp_request"):
+            try:
+                # X-Request-Timeout 헤더(초)로 요청 데드라인 지정 가능
+                response = await cancel_on_disconnect(
+                    request,
+                    handle_mcp_request(mcp_request, request.headers.get("x-request-timeout"),
+                                       request.headers.get("accept-language"),
+                                       client_key(request.scope)),
+                )
+            except ClientDisconnected:
+                root.set_attribute("client.disconnected", True)
+                return Response(status_code=499)
+        
+        with tracer.span("mcp.serialize") as span:
+            return encode_response(response, request.headers.get("accept-encoding"), span)
+
+# SSE 스트림은 상태가 없으므로 어느 워커로 재연결해도 됨: 일정 시간 뒤 스트림을 닫아
+# 워커 간 재분배와 재시작 시 드레이닝이 가능하게 하고, 클라이언트에는 재연결 간격을 알림
+SSE_PING_INTERVAL = float(os.environ.get("KBEAUTY_SSE_PING_INTERVAL", "30"))
+SSE_MAX_AGE = float(os.environ.get("KBEAUTY_SSE_MAX_AGE", "300"))
+SSE_RETRY_MS = 3000
 
 @app.get("/mcp")
 async def mcp_sse_endpoint(request: Request):
     """MCP endpoint for Server-Sent Events"""
     async def event_stream():
         session_id = str(uuid.uuid4())
+        closes_at = asyncio.get_running_loop().time() + SSE_MAX_AGE
         
         # 초기화 메시지
         init_data = {
@@ -431,12 +719,17 @@ async def mcp_sse_endpoint(request: Request):
             }
         }
         
-        yield f"data: {json.dumps(init_data)}\n\n"
+        with tracer.span("sse.write", session_id=session_id, event="init"):
+            yield f"retry: {SSE_RETRY_MS}\ndata: {json.dumps(init_data)}\n\n"
         
         # Keep connection alive
         while True:
-            yield f"data: {json.dumps({'ping': datetime.now().isoformat()})}\n\n"
-            await asyncio.sleep(30)
+            with tracer.span("sse.write", session_id=session_id, event="ping"):
+                yield f"data: {json.dumps({'ping': datetime.now().isoformat()})}\n\n"
+            remaining = closes_at - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(min(SSE_PING_INTERVAL, remaining))
     
     return StreamingResponse(
         event_stream(),
@@ -448,8 +741,89 @@ async def mcp_sse_endpoint(request: Request):
         }
     )
 
+# 연결당 동시 처리 요청 수와 메시지 크기 상한
+WS_MAX_IN_FLIGHT = int(os.environ.get("KBEAUTY_WS_MAX_IN_FLIGHT", "32"))
+WS_MAX_MESSAGE_BYTES = int(os.environ.get("KBEAUTY_WS_MAX_MESSAGE_BYTES", str(1024 * 1024)))
+
+async def dispatch_ws_message(message: Dict[str, Any], accept_language: Optional[str] = None,
+                              client: Optional[str] = None) -> str:
+    """Run one JSON-RPC request from a WebSocket through the POST /mcp dispatcher
+
+    ``accept_language`` and ``client`` come from the handshake; the language
+    applies to every call on the connection that has no ``language`` argument.
+    Each call is charged to the client's token bucket and counts toward the
+    worker's in-flight cap, like a POST /mcp request.
+    """
+    if ADMISSION is None:
+        return await _dispatch_ws_message(message, accept_language, client)
+    if ADMISSION.overloaded():
+        return ws_error(message.get("id"), OVERLOADED, "Server overloaded", 1)
+    retry_after = ADMISSION.rate_limit(client or "unknown", message)
+    if retry_after:
+        return ws_error(message.get("id"), RATE_LIMITED, "Rate limit exceeded", retry_after)
+    with ADMISSION.admitted():
+        return await _dispatch_ws_message(message, accept_language, client)
+
+def ws_error(request_id: Any, code: int, message: str, retry_after: float) -> str:
+    # 헤더가 없으므로 Retry-After는 error.data로 전달
+    return dumps({
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "error": {"code": code, "message": message, "data": {"retryAfter": math.ceil(retry_after)}}
+    }).decode("utf-8")
+
+async def _dispatch_ws_message(message: Dict[str, Any], accept_language: Optional[str],
+                               client: Optional[str]) -> str:
+    with tracer.span("WS /mcp/ws", kind=SPAN_KIND_SERVER) as root:
+        try:
+            mcp_request = MCPRequest(**message)
+        except (ValueError, TypeError) as e:
+            return dumps({
+                "jsonrpc": "2.0",
+                "id": message.get("id"),
+                "error": {"code": -32600, "message": f"Invalid request: {str(e)}"}
+            }).decode("utf-8")
+        root.set_attribute("rpc.method", mcp_request.method)
+        recorder.record(mcp_request.method, mcp_request.params, "websocket")
+        
+        # 헤더가 없으므로 params._meta.timeout(초)으로 요청 데드라인 지정
+        meta = mcp_request.params.get("_meta")
+        timeout = meta.get("timeout") if isinstance(meta, dict) else None
+        with tracer.span("handle_mcp_request"):
+            response = await handle_mcp_request(mcp_request, timeout, accept_language, client)
+        
+        with tracer.span("mcp.serialize") as span:
+            payload = response._payload
+            if payload is not None:
+                body, _ = payload.body(response.id, None)
+            else:
+                body = dumps(response.dict())
+            span.set_attribute("response.bytes", len(body))
+            return body.decode("utf-8")
+
+@app.websocket("/mcp/ws")
+async def mcp_websocket_endpoint(websocket: WebSocket):
+    """MCP over WebSocket: JSON-RPC text frames, concurrent calls matched by id"""
+    subprotocols = websocket.scope.get("subprotocols") or []
+    await websocket.accept(subprotocol="mcp" if "mcp" in subprotocols else None)
+    
+    async def receive():
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return None
+        return message.get("text") if message.get("text") is not None else message.get("bytes")
+    
+    accept_language = websocket.headers.get("accept-language")
+    client = client_key(websocket.scope)
+    session = WebSocketSession(lambda message: dispatch_ws_message(message, accept_language, client),
+                               max_in_flight=WS_MAX_IN_FLIGHT,
+                               max_message_bytes=WS_MAX_MESSAGE_BYTES)
+    try:
+        await session.serve(receive, websocket.send_text)
+    except MessageTooLarge as e:
+        await websocket.close(code=CLOSE_MESSAGE_TOO_BIG, reason=str(e))
+
 if __name__ == "__main__":
-    import os
     import uvicorn
     # Google Cloud Run에서 PORT 환경변수 사용
     port = int(os.environ.get("PORT", 8080))
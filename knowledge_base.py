@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+K-Beauty Knowledge Base
+Routines, concern mappings and tool text loaded from versioned data files,
+hot-reloaded in the background and installed with one atomic reference swap
+"""
+
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from prompt_templates import PromptTemplate
+from trend_analytics import CATEGORIES as TREND_CATEGORIES, normalize_term
+
+logger = logging.getLogger("k-beauty-mcp")
+
+DEFAULT_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "knowledge.json")
+
+# 데이터 파일 변경 확인 주기 (초, 0 = 감시 안 함)
+DEFAULT_RELOAD_INTERVAL = 5.0
+
+
+def _text(value: Any) -> str:
+    # 긴 문구는 편집하기 쉽도록 줄 단위 배열로 저장
+    return "\n".join(value) if isinstance(value, list) else str(value)
+
+
+# 언어별로 번역되는 표 (번역에 없는 항목은 기본 언어 값을 그대로 사용)
+LOCALIZED_TABLES = ("routines", "concerns", "tool_text", "labels", "trend_categories", "seasonal")
+
+
+def _overlay(base: Any, override: Any) -> Any:
+    if isinstance(base, dict) and isinstance(override, dict):
+        merged = dict(base)
+        for key, value in override.items():
+            merged[key] = _overlay(base.get(key), value)
+        return merged
+    return base if override is None else override
+
+
+@functools.lru_cache(maxsize=512)
+def negotiate_language(accept_language: str, available: Tuple[str, ...]) -> Optional[str]:
+    """Best available language for an Accept-Language value (or a bare code like "en-US")
+
+    Tags are tried in q-value order, each as the full tag and then its
+    primary subtag; ``*`` matches the first available language. Returns
+    None if nothing matches.
+    """
+    ranked = []
+    for position, part in enumerate(accept_language.split(",")):
+        tag, _, params = part.partition(";")
+        tag = tag.strip().lower().replace("_", "-")
+        if not tag:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            ranked.append((-quality, position, tag))
+
+    for _, _, tag in sorted(ranked):
+        if tag == "*":
+            return available[0] if available else None
+        for candidate in (tag, tag.split("-", 1)[0]):
+            if candidate in available:
+                return candidate
+    return None
+
+
+class LanguagePack:
+    """Tables for one output language, with every fixed response rendered at load time
+
+    Routine sections per skin type, concern guides and the seasonal guide
+    for every season / skin type / climate combination are plain strings
+    here, so handlers only look them up and append request-specific text.
+    """
+
+    __slots__ = ("language", "morning_routines", "evening_routine", "concerns", "tool_text",
+                 "labels", "trend_categories", "routine_sections", "tool_responses",
+                 "seasonal_guides")
+
+    def __init__(self, language: str, data: Dict[str, Any]):
+        self.language = language
+
+        routines = data["routines"]
+        # 루틴 단계는 응답에 들어갈 형태로 미리 번호를 매겨 둠
+        self.morning_routines: Dict[str, str] = {
+            skin_type: self._numbered(steps) for skin_type, steps in routines["morning"].items()
+        }
+        if "default" not in self.morning_routines:
+            raise ValueError("routines.morning needs a 'default' entry")
+        self.evening_routine = self._numbered(routines["evening"])
+
+        self.tool_text: Dict[str, PromptTemplate] = {
+            tool: PromptTemplate(tool, _text(text)) for tool, text in data["tool_text"].items()
+        }
+        if "default" not in self.tool_text:
+            raise ValueError("tool_text needs a 'default' entry")
+        self.labels: Dict[str, PromptTemplate] = {
+            key: PromptTemplate(key, _text(text)) for key, text in data.get("labels", {}).items()
+        }
+        self.trend_categories: Dict[str, str] = dict(data.get("trend_categories", {}))
+
+        concern_body = self.labels.get("concern_body")
+        self.concerns: Tuple[Tuple[str, Dict[str, str]], ...] = tuple(
+            (key, self._concern(info, concern_body)) for key, info in data["concerns"].items()
+        )
+
+        seasonal = data.get("seasonal", {})
+        skin_types = seasonal.get("skin_types", {})
+        self.routine_sections: Dict[str, str] = {}
+        self.tool_responses: Dict[Tuple[str, str], str] = {}
+        if "routine_morning" in self.labels and "routine_evening" in self.labels:
+            for skin_type in skin_types:
+                self.routine_sections[skin_type] = self._routine_section(skin_type)
+        for skin_type in skin_types:
+            self.tool_responses["recommend_routine", skin_type] = \
+                self.render_tool_text("recommend_routine", {"skin_type": skin_type})
+        for tool, template in self.tool_text.items():
+            if not template.slots:
+                self.tool_responses[tool, ""] = template.render()
+
+        self.seasonal_guides: Dict[Tuple[str, str, str], str] = {}
+        if "seasonal_skincare_guide" in self.tool_text:
+            template = self.tool_text["seasonal_skincare_guide"]
+            for season, season_info in seasonal.get("seasons", {}).items():
+                season_tips = "\n".join(f"• {tip}" for tip in season_info["tips"])
+                for skin_type, skin_info in skin_types.items():
+                    for climate, climate_info in seasonal.get("climates", {}).items():
+                        self.seasonal_guides[season, skin_type, climate] = template.render({
+                            "season_label": season_info["label"],
+                            "season_tips": season_tips,
+                            "skin_type_label": skin_info["label"],
+                            "skin_type_tip": skin_info["tip"],
+                            "climate_label": climate_info["label"],
+                            "climate_tip": climate_info["tip"],
+                        })
+
+    @staticmethod
+    def _numbered(steps: List[str]) -> str:
+        return "".join(f"{n}. {step}\n" for n, step in enumerate(steps, 1)) + "\n"
+
+    @staticmethod
+    def _concern(info: Dict[str, Any], body: Optional[PromptTemplate]) -> Dict[str, str]:
+        concern = {
+            "ingredients": ", ".join(info["ingredients"]),
+            "avoid": info["avoid"],
+            "routine": info["routine"],
+        }
+        concern["body"] = body.render(concern) if body is not None else ""
+        return concern
+
+    def morning_routine(self, skin_type: str) -> str:
+        return self.morning_routines.get(skin_type) or self.morning_routines["default"]
+
+    def _routine_section(self, skin_type: str) -> str:
+        return (self.labels["routine_morning"].render({"skin_type": skin_type})
+                + self.morning_routine(skin_type)
+                + self.labels["routine_evening"].render()
+                + self.evening_routine)
+
+    def routine_section(self, skin_type: str) -> str:
+        """Morning and evening routine block (pre-rendered for the known skin types)"""
+        section = self.routine_sections.get(skin_type)
+        return section if section is not None else self._routine_section(skin_type)
+
+    def routine_response(self, skin_type: str) -> str:
+        response = self.tool_responses.get(("recommend_routine", skin_type))
+        if response is None:
+            response = self.render_tool_text("recommend_routine", {"skin_type": skin_type})
+        return response
+
+    def match_concern(self, concern: str) -> Optional[Dict[str, str]]:
+        """Guide for a concern (the first key contained in it, or containing it)"""
+        concern_lower = concern.lower()
+        for key, info in self.concerns:
+            if key in concern_lower or concern_lower in key:
+                return info
+        return None
+
+    def seasonal_guide(self, season: str, skin_type: str, climate: str) -> Optional[str]:
+        return self.seasonal_guides.get((season, skin_type, climate))
+
+    def label(self, key: str, values: Optional[Dict[str, str]] = None) -> str:
+        return self.labels[key].render(values)
+
+    def render_tool_text(self, tool_name: str, values: Optional[Dict[str, str]] = None) -> str:
+        rendered = self.tool_responses.get((tool_name, ""))
+        if rendered is not None:
+            return rendered
+        template = self.tool_text.get(tool_name) or self.tool_text["default"]
+        return template.render(values)
+
+
+class Knowledge:
+    """One immutable, fully indexed version of the knowledge tables
+
+    Handlers read ``KNOWLEDGE.current`` once and use that object for the
+    whole request, so a reload mid-request never mixes two versions.
+    Each language in ``translations`` is overlaid on the default-language
+    tables and built into its own LanguagePack.
+    """
+
+    __slots__ = ("version", "digest", "loaded_at", "default_language", "languages", "trend_terms",
+                 "_codes")
+
+    def __init__(self, data: Dict[str, Any], digest: str):
+        self.version = str(data.get("version") or digest[:12])
+        self.digest = digest
+        self.loaded_at = time.time()
+        self.default_language = str(data.get("default_language") or "ko").lower()
+
+        base = {table: data[table] for table in LOCALIZED_TABLES if table in data}
+        self.languages: Dict[str, LanguagePack] = {
+            self.default_language: LanguagePack(self.default_language, base),
+        }
+        for language, translation in (data.get("translations") or {}).items():
+            language = language.lower()
+            if language != self.default_language:
+                self.languages[language] = LanguagePack(language, _overlay(base, translation))
+        self._codes = tuple(self.languages)
+
+        # 트렌드 집계에 허용되는 용어 (정규화된 형태) - 고민 키는 항상 포함
+        vocabulary = data.get("trend_vocabulary") or {}
+        self.trend_terms: Dict[str, frozenset] = {}
+        for category in TREND_CATEGORIES:
+            terms = list(vocabulary.get(category, ()))
+            if category == "concerns":
+                terms.extend(data["concerns"])
+            self.trend_terms[category] = frozenset(
+                term for term in map(normalize_term, terms) if term is not None
+            )
+
+    def is_trend_term(self, category: str, term: str) -> bool:
+        """Whether a normalized term may be counted (and shown) as a trend"""
+        terms = self.trend_terms.get(category)
+        return terms is not None and term in terms
+
+    def language(self, requested: Optional[str] = None) -> LanguagePack:
+        """Pack for a language code or Accept-Language value (default language if unmatched)"""
+        pack = self.languages.get(requested) if requested else None
+        if pack is None and requested:
+            pack = self.languages.get(negotiate_language(requested, self._codes))
+        return pack or self.languages[self.default_language]
+
+
+def load_knowledge(path: str) -> Knowledge:
+    """Parse and index a knowledge file (raises on invalid data)"""
+    with open(path, "rb") as f:
+        raw = f.read()
+    return Knowledge(json.loads(raw), hashlib.sha256(raw).hexdigest())
+
+
+class KnowledgeStore:
+    """Holds the current Knowledge and swaps in new versions without locking readers
+
+    ``reload`` parses and indexes the file off the event loop, then
+    replaces the single ``current`` reference; readers never wait and a
+    bad file (any exception while loading) leaves the previous version in
+    place. Listeners registered with ``on_reload`` run after each swap
+    (e.g. to clear result caches); a failing listener is logged and
+    recorded in ``last_error`` but does not undo the swap.
+    """
+
+    def __init__(self, path: str = DEFAULT_DATA_PATH):
+        self.path = path
+        self.current: Knowledge = load_knowledge(path)
+        self.reloads = 0
+        self.last_reload_ms = 0.0
+        self.last_error: Optional[str] = None
+        self._mtime = self._stat()
+        self._listeners: List[Callable[[Knowledge], None]] = []
+        self._watcher: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls) -> "KnowledgeStore":
+        return cls(os.environ.get("KBEAUTY_DATA_PATH", DEFAULT_DATA_PATH))
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def on_reload(self, listener: Callable[[Knowledge], None]) -> None:
+        self._listeners.append(listener)
+
+    async def reload(self) -> bool:
+        """Load the data file in a thread and install it; returns True if swapped"""
+        start = time.perf_counter()
+        mtime = self._stat()
+        try:
+            knowledge = await asyncio.to_thread(load_knowledge, self.path)
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+            logger.warning("Knowledge reload failed, keeping version %s: %s",
+                           self.current.version, self.last_error)
+            return False
+        finally:
+            self._mtime = mtime
+
+        if knowledge.digest == self.current.digest:
+            return False
+        previous = self.current
+        self.current = knowledge
+        self.last_error = None
+        for listener in self._listeners:
+            try:
+                listener(knowledge)
+            except Exception as e:
+                name = getattr(listener, "__name__", repr(listener))
+                self.last_error = f"listener {name}: {type(e).__name__}: {e}"
+                logger.exception("Knowledge reload listener failed (version %s is installed)",
+                                 knowledge.version)
+        self.reloads += 1
+        self.last_reload_ms = (time.perf_counter() - start) * 1000
+        logger.info("Knowledge reloaded: %s -> %s in %.1fms",
+                    previous.version, knowledge.version, self.last_reload_ms)
+        return True
+
+    async def _watch(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            # 어떤 예외가 나도 감시 태스크는 계속 돎 (취소만 빠져나감)
+            try:
+                if self._stat() != self._mtime:
+                    await self.reload()
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                logger.exception("Knowledge watcher error, will retry in %.1fs", interval)
+
+    def start_watching(self, interval: Optional[float] = None) -> None:
+        """Poll the data file from the running loop (KBEAUTY_RELOAD_INTERVAL seconds)"""
+        if interval is None:
+            interval = float(os.environ.get("KBEAUTY_RELOAD_INTERVAL", DEFAULT_RELOAD_INTERVAL))
+        if interval > 0 and self._watcher is None:
+            self._watcher = asyncio.get_running_loop().create_task(self._watch(interval))
+
+    def stop_watching(self) -> None:
+        if self._watcher is not None:
+            self._watcher.cancel()
+            self._watcher = None
+
+    def stats(self) -> Dict[str, Any]:
+        current = self.current
+        return {
+            "version": current.version,
+            "digest": current.digest[:12],
+            "loaded_at": current.loaded_at,
+            "languages": list(current.languages),
+            "reloads": self.reloads,
+            "reload_ms": round(self.last_reload_ms, 3),
+            "last_error": self.last_error,
+        }
+
+
+KNOWLEDGE = KnowledgeStore.from_env()
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+K-Beauty Skin Profile Store
+SQLite (WAL) storage for user skin profiles and photo analysis history
+"""
+
+import asyncio
+import json
+import logging
+import os
+import queue
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("k-beauty-mcp")
+
+PROFILE_FIELDS = ("skin_type", "user_age", "skin_concerns", "budget")
+
+DEFAULT_DB_PATH = os.path.join(os.path.expanduser("~"), ".k-beauty-mcp", "profiles.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    profile_id TEXT PRIMARY KEY,
+    skin_type TEXT,
+    user_age REAL,
+    skin_concerns TEXT,
+    budget TEXT,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS photo_history (
+    id INTEGER PRIMARY KEY,
+    profile_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    analysis_focus TEXT NOT NULL,
+    image_description TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_photo_history_profile
+    ON photo_history (profile_id, created_at DESC);
+"""
+
+# 부분 업데이트: 전달되지 않은 필드(NULL)는 기존 값을 유지
+UPSERT_PROFILE = """
+INSERT INTO profiles (profile_id, skin_type, user_age, skin_concerns, budget, updated_at)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (profile_id) DO UPDATE SET
+    skin_type = COALESCE(excluded.skin_type, profiles.skin_type),
+    user_age = COALESCE(excluded.user_age, profiles.user_age),
+    skin_concerns = COALESCE(excluded.skin_concerns, profiles.skin_concerns),
+    budget = COALESCE(excluded.budget, profiles.budget),
+    updated_at = excluded.updated_at
+"""
+
+INSERT_HISTORY = """
+INSERT INTO photo_history (profile_id, created_at, analysis_focus, image_description)
+VALUES (?, ?, ?, ?)
+"""
+
+
+class ProfileStore:
+    """Skin profile store with a small connection pool and batched writes
+
+    Blocking SQLite calls run on a thread pool sized to the connection
+    pool. Writes are buffered on the event loop and flushed in a single
+    transaction, either after ``flush_interval`` seconds or as soon as
+    ``batch_size`` writes are pending. Reads overlay buffered writes, so a
+    caller always sees its own updates.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, pool_size: int = 4,
+                 batch_size: int = 64, flush_interval: float = 0.05):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        if path == ":memory:":
+            # 인메모리 DB는 연결마다 따로 생기므로 연결 하나만 사용
+            pool_size = 1
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._connections: "queue.SimpleQueue[sqlite3.Connection]" = queue.SimpleQueue()
+        for _ in range(pool_size):
+            self._connections.put(self._connect())
+        self._executor = ThreadPoolExecutor(max_workers=pool_size,
+                                            thread_name_prefix="profile-store")
+
+        self._pending_profiles: Dict[str, Dict[str, Any]] = {}
+        self._pending_history: List[tuple] = []
+        self._inflight_profiles: Dict[str, Dict[str, Any]] = {}
+        self._inflight_history: List[tuple] = []
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: set = set()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.executescript(SCHEMA)
+        return conn
+
+    def _with_connection(self, fn, *args):
+        conn = self._connections.get()
+        try:
+            return fn(conn, *args)
+        finally:
+            self._connections.put(conn)
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._with_connection, fn, *args)
+
+    # ---- 읽기 ----
+
+    @staticmethod
+    def _select_profile(conn: sqlite3.Connection, profile_id: str) -> Optional[Dict[str, Any]]:
+        row = conn.execute(
+            "SELECT skin_type, user_age, skin_concerns, budget FROM profiles WHERE profile_id = ?",
+            (profile_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        skin_type, user_age, skin_concerns, budget = row
+        return {
+            "skin_type": skin_type,
+            "user_age": user_age,
+            "skin_concerns": json.loads(skin_concerns) if skin_concerns else None,
+            "budget": budget,
+        }
+
+    @staticmethod
+    def _select_history(conn: sqlite3.Connection, profile_id: str, limit: int) -> List[tuple]:
+        return conn.execute(
+            "SELECT created_at, analysis_focus, image_description FROM photo_history "
+            "WHERE profile_id = ? ORDER BY created_at DESC LIMIT ?",
+            (profile_id, limit),
+        ).fetchall()
+
+    async def get_profile(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        """Return the stored profile (including unflushed updates) or None"""
+        # 읽는 동안 flush가 커밋하고 버퍼를 비울 수 있으므로 읽기 전 버퍼도 함께 적용
+        # (오래된 것부터 덮어쓰므로 같은 값이 두 번 적용되어도 결과는 같음)
+        before = self._buffered_profile(profile_id)
+        profile = await self._run(self._select_profile, profile_id)
+        for overlay in before + self._buffered_profile(profile_id):
+            if overlay:
+                profile = {**(profile or dict.fromkeys(PROFILE_FIELDS)), **overlay}
+        return profile
+
+    def _buffered_profile(self, profile_id: str) -> List[Optional[Dict[str, Any]]]:
+        return [dict(buffer[profile_id]) if profile_id in buffer else None
+                for buffer in (self._inflight_profiles, self._pending_profiles)]
+
+    def _buffered_history(self, profile_id: str) -> List[tuple]:
+        return [entry[1:] for entry in self._inflight_history + self._pending_history
+                if entry[0] == profile_id]
+
+    async def get_photo_history(self, profile_id: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Return the most recent photo analyses for a profile, newest first"""
+        before = self._buffered_history(profile_id)
+        rows = await self._run(self._select_history, profile_id, limit)
+        # 읽는 동안 커밋된 항목은 DB와 버퍼 양쪽에 보이므로 중복 제거
+        merged = set(before + self._buffered_history(profile_id)) | set(map(tuple, rows))
+        rows = sorted(merged, key=lambda row: row[0], reverse=True)[:limit]
+        return [
+            {
+                "created_at": created_at,
+                "analysis_focus": json.loads(analysis_focus),
+                "image_description": image_description,
+            }
+            for created_at, analysis_focus, image_description in rows
+        ]
+
+    # ---- 쓰기 (배치) ----
+
+    async def update_profile(self, profile_id: str, **fields: Any) -> None:
+        """Buffer a partial profile update; ``None`` values are ignored"""
+        unknown = set(fields) - set(PROFILE_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown profile fields: {', '.join(sorted(unknown))}")
+        fields = {key: value for key, value in fields.items() if value is not None}
+        if not fields:
+            return
+        self._pending_profiles.setdefault(profile_id, {}).update(fields)
+        self._schedule_flush()
+
+    async def add_photo_analysis(self, profile_id: str, analysis_focus: List[str],
+                                 image_description: str = "") -> None:
+        """Buffer a photo analysis history entry"""
+        self._pending_history.append(
+            (profile_id, time.time(), json.dumps(list(analysis_focus)), image_description or None)
+        )
+        self._schedule_flush()
+
+    def _pending_count(self) -> int:
+        return len(self._pending_profiles) + len(self._pending_history)
+
+    def _schedule_flush(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._pending_count() >= self.batch_size:
+            if self._flush_handle is not None:
+                self._flush_handle.cancel()
+                self._flush_handle = None
+            self._spawn_flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.flush_interval, self._spawn_flush)
+
+    def _spawn_flush(self) -> None:
+        self._flush_handle = None
+        task = asyncio.get_running_loop().create_task(self.flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_done)
+
+    def _flush_done(self, task: asyncio.Task) -> None:
+        self._flush_tasks.discard(task)
+        if task.cancelled() or task.exception() is None:
+            return
+        # 실패한 배치는 버퍼로 돌아가 있으므로, 새 쓰기가 없어도 flush_interval 뒤 다시 시도
+        # (배치 크기를 넘어도 즉시 재시도하지 않아 DB 오류가 계속될 때 바쁜 루프가 되지 않음)
+        logger.error("Profile flush failed, retrying in %.1fs: %r",
+                     self.flush_interval, task.exception())
+        if self._flush_handle is None and self._pending_count():
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self.flush_interval, self._spawn_flush)
+
+    @staticmethod
+    def _write_batch(conn: sqlite3.Connection, profiles: List[tuple], history: List[tuple]) -> None:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if profiles:
+                conn.executemany(UPSERT_PROFILE, profiles)
+            if history:
+                conn.executemany(INSERT_HISTORY, history)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    async def flush(self) -> None:
+        """Write all buffered updates in one transaction"""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            if not self._pending_count():
+                return
+            self._inflight_profiles, self._pending_profiles = self._pending_profiles, {}
+            self._inflight_history, self._pending_history = self._pending_history, []
+
+            now = time.time()
+            profiles = [
+                (
+                    profile_id,
+                    fields.get("skin_type"),
+                    fields.get("user_age"),
+                    json.dumps(fields["skin_concerns"]) if fields.get("skin_concerns") is not None else None,
+                    fields.get("budget"),
+                    now,
+                )
+                for profile_id, fields in self._inflight_profiles.items()
+            ]
+            try:
+                await self._run(self._write_batch, profiles, self._inflight_history)
+            except BaseException:
+                # 실패한 배치는 다음 flush에서 다시 시도 (이후 업데이트가 우선)
+                for profile_id, fields in self._inflight_profiles.items():
+                    self._pending_profiles[profile_id] = {**fields, **self._pending_profiles.get(profile_id, {})}
+                self._pending_history[:0] = self._inflight_history
+                raise
+            finally:
+                self._inflight_profiles, self._inflight_history = {}, []
+
+    async def close(self) -> None:
+        """Flush buffered writes and close every pooled connection"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        await self.flush()
+        self._executor.shutdown(wait=True)
+        while not self._connections.empty():
+            self._connections.get().close()
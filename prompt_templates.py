@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+K-Beauty Prompt Templates
+Prompts are split into static segments and dynamic slots once at import time
+"""
+
+from string import Formatter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+# 섹션 헤더 번호처럼 선택된 섹션 기준으로 다시 매겨지는 예약 슬롯
+INDEX_SLOT = "_index"
+
+# (섹션 키, 텍스트) - 키가 None이면 항상 출력되는 블록
+Block = Tuple[Union[None, str, Tuple[str, ...]], str]
+
+
+def _split(text: str) -> List[Tuple[str, Optional[str]]]:
+    """Split template text into (literal, slot_name) pairs"""
+    return [
+        (literal, field_name)
+        for literal, field_name, _spec, _conv in Formatter().parse(text)
+    ]
+
+
+class PromptTemplate:
+    """Prompt compiled into static segments and slots, with optional sections"""
+
+    __slots__ = ("name", "_blocks", "_section_keys", "_compiled")
+
+    def __init__(self, name: str, blocks: Union[str, Sequence[Block]]):
+        self.name = name
+        if isinstance(blocks, str):
+            blocks = [(None, blocks)]
+
+        self._blocks: List[Tuple[Optional[frozenset], List[Tuple[str, Optional[str]]]]] = []
+        section_keys: List[str] = []
+        for key, text in blocks:
+            if key is None:
+                keys = None
+            else:
+                keys = frozenset((key,) if isinstance(key, str) else key)
+                section_keys.extend(k for k in sorted(keys) if k not in section_keys)
+            self._blocks.append((keys, _split(text)))
+
+        self._section_keys = tuple(section_keys)
+        self._compiled: Dict[Optional[frozenset], Tuple[Tuple[str, ...], Tuple[str, ...]]] = {}
+        # 전체 섹션 버전은 로드 시점에 미리 컴파일
+        self._compile(None)
+
+    @property
+    def sections(self) -> Tuple[str, ...]:
+        """Section keys that can be selected at render time"""
+        return self._section_keys
+
+    @property
+    def slots(self) -> Tuple[str, ...]:
+        """Slot names the full template fills at render time"""
+        return self._compile(None)[1]
+
+    def _compile(self, selection: Optional[frozenset]) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """Merge the selected blocks into alternating statics and slot names"""
+        compiled = self._compiled.get(selection)
+        if compiled is not None:
+            return compiled
+
+        statics: List[str] = [""]
+        slots: List[str] = []
+        index = 0
+        for keys, parts in self._blocks:
+            if keys is not None and selection is not None and not keys & selection:
+                continue
+            if any(slot == INDEX_SLOT for _literal, slot in parts):
+                index += 1
+            for literal, slot in parts:
+                statics[-1] += literal
+                if slot is None:
+                    continue
+                if slot == INDEX_SLOT:
+                    statics[-1] += str(index)
+                else:
+                    slots.append(slot)
+                    statics.append("")
+
+        compiled = (tuple(statics), tuple(slots))
+        self._compiled[selection] = compiled
+        return compiled
+
+    def render(self, values: Optional[Dict[str, str]] = None,
+               sections: Optional[Iterable[str]] = None) -> str:
+        """Render the prompt with a single join
+
+        If ``sections`` is given, only blocks tagged with one of those keys
+        are emitted (untagged blocks are always emitted).
+        """
+        selection = None
+        if sections is not None:
+            selection = frozenset(sections) & frozenset(self._section_keys)
+            if len(selection) == len(self._section_keys):
+                selection = None
+        statics, slots = self._compile(selection)
+
+        if not slots:
+            return statics[0]
+
+        parts = [statics[0]]
+        for slot, static in zip(slots, statics[1:]):
+            parts.append(values[slot])
+            parts.append(static)
+        return "".join(parts)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+K-Beauty JSON-RPC Session
+Request bookkeeping shared by the stdio and WebSocket transports (concurrency, cancellation, ids)
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger("k-beauty-mcp.session")
+
+Respond = Callable[[Dict[str, Any]], Awaitable[None]]
+Reply = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+def valid_id(request_id: Any) -> bool:
+    return isinstance(request_id, (str, int, float, type(None)))
+
+
+def error_response(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+class RpcSession:
+    """Runs the requests of one connection as concurrent, cancellable tasks
+
+    At most ``max_in_flight`` requests run at once (subclasses hold
+    ``_running`` around their dispatch) and up to ``max_pending`` may be
+    queued or running; beyond that ``accept`` blocks, so the transport
+    stops reading and the peer gets backpressure. ``notifications/cancelled``
+    cancels the matching request, and no reply is sent for it.
+    """
+
+    def __init__(self, max_in_flight: int, max_pending: Optional[int] = None):
+        self.max_in_flight = max_in_flight
+        self.max_pending = max_pending or max_in_flight * 4
+
+        self._in_flight: Dict[Any, asyncio.Task] = {}
+        self._running: Optional[asyncio.Semaphore] = None
+        self._admitted: Optional[asyncio.Semaphore] = None
+        self._write_lock: Optional[asyncio.Lock] = None
+
+    def _open(self) -> None:
+        """Create the loop-bound primitives (call at the start of serve)"""
+        self._running = asyncio.Semaphore(self.max_in_flight)
+        self._admitted = asyncio.Semaphore(self.max_pending)
+        self._write_lock = asyncio.Lock()
+
+    def _invalid(self, message: Dict[str, Any]) -> Optional[str]:
+        """Why a request cannot be run, or None"""
+        if not valid_id(message["id"]):
+            return "id must be a string or number"
+        if message["id"] in self._in_flight:
+            # 진행 중인 id를 재사용하면 응답을 구분할 수 없으므로 거절
+            return "duplicate in-flight id"
+        if not isinstance(message.get("params") or {}, dict):
+            return "params must be an object"
+        return None
+
+    def _notify(self, message: Dict[str, Any]) -> None:
+        if message.get("method") == "notifications/cancelled":
+            params = message.get("params")
+            request_id = params.get("requestId") if isinstance(params, dict) else None
+            task = self._in_flight.get(request_id) if valid_id(request_id) else None
+            if task is not None:
+                task.cancel()
+
+    async def _run(self, respond: Respond, reply: Reply, message: Dict[str, Any]) -> None:
+        try:
+            await respond(message)
+        except asyncio.CancelledError:
+            logger.info("request %r cancelled", message.get("id"))
+        except Exception as e:
+            # 응답 없이 끝나면 클라이언트가 이 id를 영원히 기다리므로 내부 오류로 답함
+            logger.exception("request %r failed", message.get("id"))
+            await reply(error_response(message.get("id"), -32603, f"Internal error: {str(e)}"))
+
+    def _finished(self, request_id: Any, task: asyncio.Task) -> None:
+        # 시작 전에 취소된 태스크도 여기서 슬롯을 반환
+        if self._in_flight.get(request_id) is task:
+            del self._in_flight[request_id]
+        self._admitted.release()
+
+    async def accept(self, message: Any, respond: Respond, reply: Reply) -> None:
+        """Route one decoded message
+
+        Notifications are handled inline, invalid requests get a -32600
+        error through ``reply``, and requests start a task running
+        ``respond(message)`` once a pending slot is free; if ``respond``
+        raises, the request gets a -32603 error through ``reply``. Anything
+        that is not a request (e.g. a response) is ignored.
+        """
+        if not isinstance(message, dict) or "method" not in message:
+            return
+        if "id" not in message:
+            self._notify(message)
+            return
+
+        error = self._invalid(message)
+        if error is not None:
+            request_id = message["id"] if valid_id(message["id"]) else None
+            await reply(error_response(request_id, -32600, f"Invalid request: {error}"))
+            return
+
+        await self._admitted.acquire()
+        request_id = message["id"]
+        task = asyncio.create_task(self._run(respond, reply, message))
+        self._in_flight[request_id] = task
+        task.add_done_callback(lambda done, request_id=request_id: self._finished(request_id, done))
+
+    def cancel_all(self) -> None:
+        for task in list(self._in_flight.values()):
+            task.cancel()
+
+    async def drain(self) -> None:
+        """Wait for every queued and running request to finish"""
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight.values(), return_exceptions=True)
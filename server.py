@@ -5,15 +5,28 @@ Korean Beauty and Skincare Assistant with AI-Powered Photo Analysis
 """
 
 import asyncio
+import logging
+import os
+from datetime import datetime
 from mcp.server import Server
-from mcp.server.stdio import stdio_server
-from mcp.server.models import InitializationOptions, ServerCapabilities
-from mcp.types import Tool, TextContent, ToolsCapability, ImageContent
-from typing import Any, Dict, List
+from mcp.types import Tool, TextContent
+from typing import TYPE_CHECKING, Any, Dict, List
+
+from prompt_templates import PromptTemplate
+from deadlines import checkpoint, run_tool
+from knowledge_base import KNOWLEDGE
+from stdio_transport import ConcurrentStdioServer
+from tracing import NOOP_SPAN, SPAN_KIND_SERVER, tracer
+
+if TYPE_CHECKING:
+    from profile_store import ProfileStore
 
 # Create server instance
 server = Server("k-beauty-complete")
 
+# stdio 모드에서는 stdout이 프로토콜 채널이므로 로그는 stderr로만 출력
+logger = logging.getLogger("k-beauty-mcp")
+
 @server.list_tools()
 async def list_tools() -> List[Tool]:
     """List available K-Beauty tools"""
@@ -28,6 +41,10 @@ async def list_tools() -> List[Tool]:
                         "type": "string",
                         "description": "User should upload an image and Claude will analyze it. This field is for any additional context about the photo (lighting conditions, skin concerns to focus on, etc.)"
                     },
+                    "profile_id": {
+                        "type": "string",
+                        "description": "Saved skin profile id. Stored skin_type, user_age, skin_concerns and budget are used for omitted fields, and supplied fields are saved to the profile"
+                    },
                     "analysis_focus": {
                         "type": "array",
                         "items": {
@@ -74,6 +91,15 @@ async def list_tools() -> List[Tool]:
                         "enum": ["oily", "dry", "combination", "sensitive", "normal"],
                         "description": "Primary skin type"
                     },
+                    "language": {
+                        "type": "string",
+                        "enum": ["ko", "en"],
+                        "description": "Response language (default: ko)"
+                    },
+                    "profile_id": {
+                        "type": "string",
+                        "description": "Saved skin profile id. Stored skin_type, user_age, skin_concerns and budget are used for omitted fields, and supplied fields are saved to the profile"
+                    },
                     "skin_concerns": {
                         "type": "array",
                         "items": {"type": "string"},
@@ -85,7 +111,7 @@ async def list_tools() -> List[Tool]:
                         "description": "Budget preference"
                     }
                 },
-                "required": ["skin_type"]
+                "required": []
             }
         ),
         Tool(
@@ -143,6 +169,11 @@ async def list_tools() -> List[Tool]:
                         "type": "string",
                         "enum": ["current", "2024", "2025", "emerging"],
                         "description": "Time period for trend analysis"
+                    },
+                    "language": {
+                        "type": "string",
+                        "enum": ["ko", "en"],
+                        "description": "Response language (default: ko)"
                     }
                 },
                 "required": ["trend_type"]
@@ -168,9 +199,18 @@ async def list_tools() -> List[Tool]:
                         "type": "string",
                         "enum": ["oily", "dry", "combination", "sensitive", "normal"],
                         "description": "Skin type"
+                    },
+                    "language": {
+                        "type": "string",
+                        "enum": ["ko", "en"],
+                        "description": "Response language (default: ko)"
+                    },
+                    "profile_id": {
+                        "type": "string",
+                        "description": "Saved skin profile id. Stored skin_type, user_age, skin_concerns and budget are used for omitted fields, and supplied fields are saved to the profile"
                     }
                 },
-                "required": ["season", "skin_type"]
+                "required": ["season"]
             }
         ),
         Tool(
@@ -206,84 +246,94 @@ async def list_tools() -> List[Tool]:
                         "type": "string",
                         "enum": ["mild", "moderate", "severe"],
                         "description": "Severity level of concerns"
+                    },
+                    "language": {
+                        "type": "string",
+                        "enum": ["ko", "en"],
+                        "description": "Response language (default: ko)"
+                    },
+                    "profile_id": {
+                        "type": "string",
+                        "description": "Saved skin profile id. Stored skin_type, user_age, skin_concerns and budget are used for omitted fields, and supplied fields are saved to the profile"
                     }
                 },
-                "required": ["concerns"]
+                "required": []
             }
         )
     ]
 
-@server.call_tool()
-async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
-    """Handle tool calls"""
-    
-    if name == "analyze_skin_from_photo":
-        image_description = arguments.get("image_description", "")
-        analysis_focus = arguments.get("analysis_focus", ["overall_condition"])
-        user_age = arguments.get("user_age")
-        skin_type_self = arguments.get("skin_type_self_assessment", "unknown")
-        
-        analysis_request = f"""
+# 프롬프트 템플릿 (로드 시점에 정적 세그먼트/슬롯으로 분리)
+PHOTO_ANALYSIS_PROMPT = PromptTemplate("analyze_skin_from_photo", [
+    (None, """
 📸 **Claude 이미지 분석 요청: 종합적인 피부 스캔**
 
-{f"사용자 설명: {image_description}" if image_description else ""}
-{f"나이: {user_age}세" if user_age else ""}
-{f"자가 진단 피부 타입: {skin_type_self}" if skin_type_self != "unknown" else ""}
-분석 포커스: {', '.join(analysis_focus)}
-
+{description_line}
+{age_line}
+{skin_type_line}
+분석 포커스: {analysis_focus}
+{history_block}
 **업로드된 피부 사진을 다음 기준으로 상세히 분석해 주세요:**
 
 ## 🔍 **세부 피부 스캔 항목**
 
-### 1. 피부톤 분석
+"""),
+    ("skin_tone", """### {_index}. 피부톤 분석
 - 피부 톤 (쿨톤/웜톤/뉴트럴)
 - 피부 밝기 레벨
 - 색조 균일성
 - 추천 파운데이션/컨실러 색상
 
-### 2. 색소침착 분석  
+"""),
+    ("pigmentation", """### {_index}. 색소침착 분석
 - 기미, 주근깨, 검버섯 위치와 정도
 - 여드름 자국 (PIH/PIE)
 - 멜라스마 여부
 - 전체적인 색소 불균형 정도
 
-### 3. 여드름/뾰루지 분석
+"""),
+    ("acne", """### {_index}. 여드름/뾰루지 분석
 - 활성 여드름 개수와 위치
 - 여드름 타입 (화이트헤드/블랙헤드/염증성)
 - 심각도 평가 (경미/중등도/심각)
 - 여드름 흉터 유무
 
-### 4. 모공 상태 분석
+"""),
+    ("pores", """### {_index}. 모공 상태 분석
 - 모공 크기 (작음/보통/큼)
 - 모공 막힘 정도
 - 모공이 두드러진 부위 (T존, 볼 등)
 - 모공 모양과 상태
 
-### 5. 블랙헤드/화이트헤드 분석
+"""),
+    ("blackheads", """### {_index}. 블랙헤드/화이트헤드 분석
 - 코, 턱, 이마 블랙헤드 분포
 - 화이트헤드 위치와 개수
 - 피지 플러그 상태
 - 제거 필요 정도
 
-### 6. 피부 질감 분석
+"""),
+    ("texture", """### {_index}. 피부 질감 분석
 - 매끄러움 vs 거칠기
 - 각질 상태
 - 피부 결 균일성
 - 표면 텍스처 품질
 
-### 7. 노화 징후 분석
+"""),
+    ("wrinkles", """### {_index}. 노화 징후 분석
 - 잔주름 위치와 깊이
 - 표정 주름 vs 나이 주름
 - 탄력 저하 정도
 - 처짐 여부
 
-### 8. 기타 특이사항
+"""),
+    ("dark_circles", """### {_index}. 기타 특이사항
 - 다크서클 정도
 - 눈가 부종
 - 피부 건조/유분 상태
 - 민감성 징후 (홍조, 자극)
 
-## 🎯 **맞춤형 K-Beauty 솔루션 제공**
+"""),
+    (None, """## 🎯 **맞춤형 K-Beauty 솔루션 제공**
 
 분석 결과를 바탕으로 다음 정보를 제공해 주세요:
 
@@ -299,24 +349,194 @@ async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
 
 ### 제품 추천 (한국 브랜드 우선)
 - 클렌저 추천
-- 토너/에센스 추천  
+- 토너/에센스 추천
 - 세럼/앰플 추천
 - 모이스처라이저 추천
 - 선크림 추천
-- 특별 관리 제품 (마스크, 필링 등)
-
+"""),
+    (("acne", "pores", "blackheads", "texture"), """- 특별 관리 제품 (마스크, 필링 등)
+"""),
+    (None, """
 ### 피해야 할 것들
 - 현재 피부 상태에 해로운 성분
 - 피해야 할 제품 타입
 - 잘못된 케어 습관
 
-### 전문 케어 추천
+"""),
+    (("pigmentation", "acne", "pores", "wrinkles", "dark_circles"), """### 전문 케어 추천
 - 피부과 시술 필요 여부
 - 에스테틱 관리 추천
 - 홈 케어 기기 활용법
 
-이 모든 분석을 통해 사용자만의 **개인 맞춤형 K-Beauty 로드맵**을 제시해 주세요!
-"""
+"""),
+    (None, """이 모든 분석을 통해 사용자만의 **개인 맞춤형 K-Beauty 로드맵**을 제시해 주세요!
+"""),
+])
+
+# 스캔 섹션 (analysis_focus 값과 동일한 키) - 솔루션 하위 블록도 같은 키로 선택됨
+PHOTO_SCAN_SECTIONS = ("skin_tone", "pigmentation", "acne", "pores", "blackheads",
+                       "texture", "wrinkles", "dark_circles")
+
+INGREDIENTS_PROMPT = PromptTemplate("analyze_ingredients", """
+🔍 **웹 검색 요청: 스킨케어 성분 분석**
+
+분석할 성분들: **{ingredients}**
+피부 타입: **{skin_type_label}**
+
+다음 정보를 웹에서 검색해 주세요:
+1. 각 성분의 효능과 효과
+2. 권장 농도 및 사용법
+3. 부작용이나 주의사항
+4. 다른 성분과의 호환성
+5. {skin_type} 피부에 적합성
+6. 이 성분들이 포함된 추천 제품
+7. 과학적 연구 결과 및 임상 데이터
+
+이 성분들에 대한 상세하고 신뢰할 수 있는 정보를 제공해 주세요.
+""")
+
+PRODUCT_COMPARISON_PROMPT = PromptTemplate("product_comparison", """
+🔍 **웹 검색 요청: K-Beauty 제품 비교**
+
+비교할 제품들: **{products}**
+비교 기준: **{comparison_criteria}**
+
+각 제품에 대해 다음 정보를 웹에서 검색해 주세요:
+1. 현재 가격과 구매처
+2. 전성분 리스트 및 핵심 성분
+3. 사용자 리뷰와 평점
+4. 전문가 의견 및 피부과 의사 추천
+5. 장점과 단점
+6. 효과 지속 시간
+7. 대체 제품 추천
+
+비교표 형태로 상세한 분석을 제공해 주세요.
+""")
+
+DUPES_PROMPT = PromptTemplate("dupes_finder", """
+🔍 **웹 검색 요청: K-Beauty 제품 대체재 찾기**
+
+타겟 제품: **{target_product}**
+최대 예산: **${max_price}**
+
+다음 정보를 웹에서 검색해 주세요:
+1. 타겟 제품의 핵심 성분 분석
+2. 유사한 성분의 저가 대체재
+3. 드럭스토어 K-Beauty 대안
+4. Reddit, 뷰티 블로거 추천 듀프
+5. 성분 대비 가격 효율성
+6. 사용자 후기 비교
+7. 구매 가능한 온라인 쇼핑몰
+
+상세한 듀프 추천과 가격, 구매처 정보를 제공해 주세요.
+""")
+
+def photo_scan_sections(analysis_focus: List[str]):
+    """Map analysis_focus values to photo scan sections (None means all)"""
+    if not analysis_focus or "overall_condition" in analysis_focus:
+        return None
+    sections = [focus for focus in analysis_focus if focus in PHOTO_SCAN_SECTIONS]
+    return sections or None
+
+# 도구 인자 -> 저장된 프로필 필드 매핑
+PROFILE_ARGUMENTS = {
+    "analyze_skin_from_photo": {"user_age": "user_age", "skin_type_self_assessment": "skin_type"},
+    "recommend_routine": {"skin_type": "skin_type", "skin_concerns": "skin_concerns", "budget": "budget"},
+    "seasonal_skincare_guide": {"skin_type": "skin_type"},
+    "skin_concern_matcher": {"concerns": "skin_concerns"},
+}
+
+_profile_store = None
+
+def get_profile_store() -> "ProfileStore":
+    """Open the profile store on first use (path from KBEAUTY_PROFILE_DB)"""
+    global _profile_store
+    if _profile_store is None:
+        # sqlite3와 스레드 풀은 profile_id를 쓰는 요청이 처음 올 때만 로드
+        from profile_store import DEFAULT_DB_PATH, ProfileStore
+        _profile_store = ProfileStore(os.environ.get("KBEAUTY_PROFILE_DB", DEFAULT_DB_PATH))
+    return _profile_store
+
+def _is_unset(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == "unknown"
+
+async def apply_profile(arguments: Dict[str, Any], field_map: Dict[str, str]) -> Dict[str, Any]:
+    """Save supplied profile fields and fill omitted arguments from the stored profile"""
+    profile_id = arguments["profile_id"]
+    store = get_profile_store()
+
+    supplied = {field: arguments[arg] for arg, field in field_map.items() if not _is_unset(arguments.get(arg))}
+    if supplied:
+        await store.update_profile(profile_id, **supplied)
+
+    stored = await store.get_profile(profile_id) or {}
+    merged = dict(arguments)
+    for arg, field in field_map.items():
+        if _is_unset(merged.get(arg)) and not _is_unset(stored.get(field)):
+            merged[arg] = stored[field]
+    return merged
+
+async def photo_history_block(profile_id: str, analysis_focus: List[str], image_description: str) -> str:
+    """Record this photo analysis and describe the previous ones"""
+    store = get_profile_store()
+    history = await store.get_photo_history(profile_id, limit=3)
+    await store.add_photo_analysis(profile_id, analysis_focus, image_description)
+    if not history:
+        return ""
+    entries = "; ".join(
+        f"{datetime.fromtimestamp(entry['created_at']).strftime('%Y-%m-%d')} ({', '.join(entry['analysis_focus'])})"
+        for entry in history
+    )
+    return f"이전 분석 기록: {entries} - 이전 결과와 비교해 변화도 함께 알려 주세요\n"
+
+@server.call_tool()
+async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
+    """Handle tool calls"""
+    with tracer.span("tools/call", kind=SPAN_KIND_SERVER, tool=name):
+        return await run_tool(name, lambda: dispatch_tool(name, arguments))
+
+async def dispatch_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
+    """Run a K-Beauty tool"""
+    
+    if name in PROFILE_ARGUMENTS and arguments.get("profile_id"):
+        with tracer.span("profile.lookup"):
+            arguments = await apply_profile(arguments, PROFILE_ARGUMENTS[name])
+        await checkpoint()
+    
+    if name == "analyze_skin_from_photo":
+        image_description = arguments.get("image_description", "")
+        analysis_focus = arguments.get("analysis_focus", ["overall_condition"])
+        user_age = arguments.get("user_age")
+        skin_type_self = arguments.get("skin_type_self_assessment", "unknown")
+        profile_id = arguments.get("profile_id")
+        
+        history_block = ""
+        if profile_id:
+            with tracer.span("profile.history"):
+                history_block = await photo_history_block(profile_id, analysis_focus, image_description)
+            await checkpoint()
+        
+        sections = photo_scan_sections(analysis_focus)
+        with tracer.span("prompt.render", template=PHOTO_ANALYSIS_PROMPT.name) as span:
+            analysis_request = PHOTO_ANALYSIS_PROMPT.render({
+                "description_line": f"사용자 설명: {image_description}" if image_description else "",
+                "age_line": f"나이: {user_age}세" if user_age else "",
+                "skin_type_line": f"자가 진단 피부 타입: {skin_type_self}" if skin_type_self != "unknown" else "",
+                "analysis_focus": ", ".join(analysis_focus),
+                "history_block": history_block,
+            }, sections=sections)
+            # 프롬프트 크기는 스팬이 샘플링됐거나 INFO 로그가 켜진 경우에만 한 번 계산
+            log_size = logger.isEnabledFor(logging.INFO)
+            if log_size or span is not NOOP_SPAN:
+                prompt_bytes = len(analysis_request.encode("utf-8"))
+                span.set_attribute("prompt.bytes", prompt_bytes)
+        if log_size:
+            logger.info(
+                "analyze_skin_from_photo prompt: %d bytes, %d/%d scan sections",
+                prompt_bytes,
+                len(set(sections)) if sections else len(PHOTO_SCAN_SECTIONS),
+                len(PHOTO_SCAN_SECTIONS),
+            )
         return [TextContent(type="text", text=analysis_request)]
     
     elif name == "search_kbeauty_brands":
@@ -342,26 +562,20 @@ async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
         skin_type = arguments.get("skin_type")
         skin_concerns = arguments.get("skin_concerns", [])
         budget = arguments.get("budget", "mixed")
+        language = KNOWLEDGE.current.language(arguments.get("language"))
+        if not skin_type:
+            return [TextContent(type="text", text=language.label("missing_skin_type"))]
         
-        result = f"## 🌸 개인 맞춤형 K-Beauty 스킨케어 루틴\n\n"
-        result += f"**피부 타입:** {skin_type.title()}\n"
+        result = language.label("routine_title")
+        result += language.label("routine_skin_type", {"skin_type": skin_type.title()})
         if skin_concerns:
-            result += f"**피부 고민:** {', '.join(skin_concerns)}\n"
-        result += f"**예산:** {budget.title()}\n\n"
+            result += language.label("routine_concerns", {"concerns": ', '.join(skin_concerns)})
+        result += language.label("routine_budget", {"budget": budget.title()})
         
-        # 피부 타입별 맞춤 루틴
-        result += f"### 🌅 아침 루틴 ({skin_type} 피부용)\n"
-        if skin_type == "oily":
-            result += f"1. 저pH 젤 클렌저\n2. BHA 토너 (주 2-3회)\n3. 나이아신아마이드 세럼\n4. 가벼운 젤 모이스처라이저\n5. 논코메도제닉 선크림 SPF 50+\n\n"
-        elif skin_type == "dry":
-            result += f"1. 크림 타입 클렌저\n2. 히알루론산 토너\n3. 비타민 C 세럼\n4. 세라마이드 크림\n5. 보습 선크림 SPF 30+\n\n"
-        else:
-            result += f"1. 순한 클렌저\n2. 토너/에센스\n3. 비타민 C 세럼\n4. 보습 크림\n5. 선크림 SPF 30+\n\n"
+        # 피부 타입별 아침/저녁 루틴 (로드 시 미리 렌더링된 블록)
+        result += language.routine_section(skin_type)
         
-        result += f"### 🌙 저녁 루틴\n"
-        result += f"1. 오일 클렌저 (더블 클렌징)\n2. 워터 베이스 클렌저\n3. 토너\n4. 트리트먼트 세럼\n5. 아이크림\n6. 나이트 크림\n7. 슬리핑 마스크 (주 2-3회)\n\n"
-        
-        result += f"🔍 **'{budget}' 예산에 맞는 구체적인 제품 추천을 원하시면 웹 검색을 통해 최신 정보를 찾아드릴 수 있습니다.**"
+        result += language.label("routine_footer", {"budget": str(budget)})
         
         return [TextContent(type="text", text=result)]
     
@@ -369,194 +583,102 @@ async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
         ingredients = arguments.get("ingredients", [])
         skin_type = arguments.get("skin_type")
         
-        search_request = f"""
-🔍 **웹 검색 요청: 스킨케어 성분 분석**
-
-분석할 성분들: **{', '.join(ingredients)}**
-피부 타입: **{skin_type if skin_type else '모든 피부 타입'}**
-
-다음 정보를 웹에서 검색해 주세요:
-1. 각 성분의 효능과 효과
-2. 권장 농도 및 사용법
-3. 부작용이나 주의사항
-4. 다른 성분과의 호환성
-5. {skin_type} 피부에 적합성
-6. 이 성분들이 포함된 추천 제품
-7. 과학적 연구 결과 및 임상 데이터
-
-이 성분들에 대한 상세하고 신뢰할 수 있는 정보를 제공해 주세요.
-"""
+        search_request = INGREDIENTS_PROMPT.render({
+            "ingredients": ", ".join(ingredients),
+            "skin_type_label": skin_type if skin_type else "모든 피부 타입",
+            "skin_type": str(skin_type),
+        })
         return [TextContent(type="text", text=search_request)]
     
     elif name == "product_comparison":
         products = arguments.get("products", [])
         comparison_criteria = arguments.get("comparison_criteria", ["price", "ingredients", "effectiveness"])
         
-        search_request = f"""
-🔍 **웹 검색 요청: K-Beauty 제품 비교**
-
-비교할 제품들: **{', '.join(products)}**
-비교 기준: **{', '.join(comparison_criteria)}**
-
-각 제품에 대해 다음 정보를 웹에서 검색해 주세요:
-1. 현재 가격과 구매처
-2. 전성분 리스트 및 핵심 성분
-3. 사용자 리뷰와 평점
-4. 전문가 의견 및 피부과 의사 추천
-5. 장점과 단점
-6. 효과 지속 시간
-7. 대체 제품 추천
-
-비교표 형태로 상세한 분석을 제공해 주세요.
-"""
+        search_request = PRODUCT_COMPARISON_PROMPT.render({
+            "products": ", ".join(products),
+            "comparison_criteria": ", ".join(comparison_criteria),
+        })
         return [TextContent(type="text", text=search_request)]
     
     elif name == "kbeauty_trends":
         trend_type = arguments.get("trend_type")
         time_period = arguments.get("time_period", "current")
         
-        search_request = f"""
-🔍 **웹 검색 요청: K-Beauty 트렌드 분석**
-
-트렌드 타입: **{trend_type}**
-시기: **{time_period}**
-
-다음 정보를 웹에서 검색해 주세요:
-1. 최신 K-Beauty 혁신과 신제품 런칭
-2. 트렌드 성분과 신기술
-3. 인기 급상승 브랜드와 신흥 업체
-4. 소셜미디어 뷰티 트렌드 (TikTok, Instagram)
-5. 업계 보고서와 시장 분석
-6. 계절별 트렌드와 2025년 예측
-7. 글로벌 vs 한국 내수 트렌드 차이
-
-현재의 포괄적인 트렌드 분석을 구체적 예시와 함께 제공해 주세요.
-"""
+        language = KNOWLEDGE.current.language(arguments.get("language"))
+        
+        search_request = language.render_tool_text("trends_search_request", {
+            "trend_type": str(trend_type),
+            "time_period": str(time_period),
+        })
         return [TextContent(type="text", text=search_request)]
     
     elif name == "seasonal_skincare_guide":
         season = arguments.get("season")
         climate = arguments.get("climate", "temperate")
         skin_type = arguments.get("skin_type")
+        language = KNOWLEDGE.current.language(arguments.get("language"))
+        if not skin_type:
+            return [TextContent(type="text", text=language.label("missing_skin_type"))]
         
-        search_request = f"""
-🔍 **웹 검색 요청: 계절별 K-Beauty 스킨케어 가이드**
-
-계절: **{season}**
-기후: **{climate}**
-피부 타입: **{skin_type}**
-
-다음 정보를 웹에서 검색해 주세요:
-1. {season} 계절 피부 관리 포인트
-2. {climate} 기후에 적합한 제품 타입
-3. {skin_type} 피부의 계절별 변화
-4. 추천 K-Beauty 제품 및 브랜드
-5. 피해야 할 성분과 루틴
-6. 전문가 추천 계절 케어 팁
-
-계절과 기후, 피부 타입을 모두 고려한 맞춤형 가이드를 제공해 주세요.
-"""
+        search_request = language.render_tool_text("seasonal_search_request", {
+            "season": str(season),
+            "climate": str(climate),
+            "skin_type": str(skin_type),
+        })
+        # 계절/피부 타입/기후 조합별 가이드는 로드 시 미리 렌더링됨
+        guide = language.seasonal_guide(str(season), str(skin_type), str(climate))
+        if guide is not None:
+            search_request = guide + "\n" + search_request
         return [TextContent(type="text", text=search_request)]
     
     elif name == "dupes_finder":
         target_product = arguments.get("target_product", "")
         max_price = arguments.get("max_price")
         
-        search_request = f"""
-🔍 **웹 검색 요청: K-Beauty 제품 대체재 찾기**
-
-타겟 제품: **{target_product}**
-최대 예산: **${max_price if max_price else '제한 없음'}**
-
-다음 정보를 웹에서 검색해 주세요:
-1. 타겟 제품의 핵심 성분 분석
-2. 유사한 성분의 저가 대체재
-3. 드럭스토어 K-Beauty 대안
-4. Reddit, 뷰티 블로거 추천 듀프
-5. 성분 대비 가격 효율성
-6. 사용자 후기 비교
-7. 구매 가능한 온라인 쇼핑몰
-
-상세한 듀프 추천과 가격, 구매처 정보를 제공해 주세요.
-"""
+        search_request = DUPES_PROMPT.render({
+            "target_product": str(target_product),
+            "max_price": str(max_price if max_price else '제한 없음'),
+        })
         return [TextContent(type="text", text=search_request)]
     
     elif name == "skin_concern_matcher":
         concerns = arguments.get("concerns", [])
         severity = arguments.get("severity", "moderate")
+        # 요청 하나는 처음 읽은 버전의 데이터만 사용
+        language = KNOWLEDGE.current.language(arguments.get("language"))
+        if not concerns:
+            return [TextContent(type="text", text=language.label("missing_concerns"))]
         
         # 기본 추천 제공
-        result = f"## 🎯 피부 고민별 K-Beauty 솔루션\n\n"
-        result += f"**고민:** {', '.join(concerns)}\n"
-        result += f"**심각도:** {severity}\n\n"
-        
-        # 고민별 기본 가이드라인
-        concern_mapping = {
-            "acne": {
-                "ingredients": ["살리실산 (BHA)", "나이아신아마이드", "센텔라 아시아티카", "티트리"],
-                "avoid": "과도한 유분, 코메도제닉 성분",
-                "routine": "더블 클렌징 → BHA 토너 → 나이아신아마이드 세럼 → 가벼운 보습"
-            },
-            "aging": {
-                "ingredients": ["레티놀", "비타민 C", "펩타이드", "히알루론산"],
-                "avoid": "과도한 스크럽, 알코올 기반 토너",
-                "routine": "세안 → 비타민 C (아침) → 레티놀 (저녁) → 충분한 보습"
-            },
-            "pigmentation": {
-                "ingredients": ["비타민 C", "나이아신아마이드", "알부틴", "kojic acid"],
-                "avoid": "자극적인 필링, 향료",
-                "routine": "세안 → 브라이트닝 세럼 → 보습 → 선크림 필수"
-            },
-            "dryness": {
-                "ingredients": ["히알루론산", "세라마이드", "스쿠알란", "글리세린"],
-                "avoid": "알코올 기반 제품, 과도한 세안",
-                "routine": "순한 세안 → 히알루론산 → 오일/크림 → 슬리핑 마스크"
-            },
-            "sensitivity": {
-                "ingredients": ["센텔라 아시아티카", "판테놀", "알로에", "무향료 포뮬라"],
-                "avoid": "향료, 알코올, 강한 액티브 성분",
-                "routine": "극순한 세안 → 진정 토너 → 배리어 강화 크림 → 물리적 선크림"
-            }
-        }
+        result = language.label("concern_title")
+        result += language.label("concern_list", {"concerns": ', '.join(concerns)})
+        result += language.label("concern_severity", {"severity": str(severity)})
         
+        # 고민별 기본 가이드라인 (로드 시 미리 렌더링된 본문)
         for concern in concerns:
-            concern_lower = concern.lower()
-            for key, info in concern_mapping.items():
-                if key in concern_lower or concern_lower in key:
-                    result += f"### {concern.title()} 솔루션:\n\n"
-                    result += f"**추천 성분:** {', '.join(info['ingredients'])}\n"
-                    result += f"**피해야 할 것:** {info['avoid']}\n"
-                    result += f"**기본 루틴:** {info['routine']}\n\n"
-                    break
+            await checkpoint()
+            info = language.match_concern(concern)
+            if info is not None:
+                result += language.label("concern_heading", {"concern": concern.title()})
+                result += info["body"]
         
         # 웹 검색 요청도 추가
-        search_request = f"""
-
-🔍 **추가 웹 검색 요청: 피부 고민 맞춤 솔루션**
-
-피부 고민: **{', '.join(concerns)}**
-심각도: **{severity}**
-
-다음 정보를 웹에서 검색해 주세요:
-1. 각 고민에 효과적인 최신 K-Beauty 제품
-2. 피부과 의사 추천 성분과 농도
-3. 고민별 단계적 관리 방법
-4. 실제 사용자 전후 사진과 후기
-5. 브랜드별 특화 제품 라인
-6. 예산대별 제품 추천
-7. 주의사항과 사용 순서
-
-구체적인 제품명과 사용법을 포함한 상세 가이드를 제공해 주세요.
-"""
-        result += search_request
+        result += language.render_tool_text("concern_search_request", {
+            "concerns": ', '.join(concerns),
+            "severity": str(severity),
+        })
         
         return [TextContent(type="text", text=result)]
     
     else:
         return [TextContent(type="text", text=f"알 수 없는 도구: {name}")]
 
-async def main():
-    """Main function"""
+async def run_sequential():
+    """Serve with the MCP library's stdio server (one request at a time)"""
+    from mcp.server.models import InitializationOptions, ServerCapabilities
+    from mcp.server.stdio import stdio_server
+    from mcp.types import ToolsCapability
+    
     async with stdio_server() as (read_stream, write_stream):
         await server.run(
             read_stream,
@@ -570,5 +692,31 @@ async def main():
             )
         )
 
+def create_concurrent_server(max_concurrency: int = 16) -> ConcurrentStdioServer:
+    """Concurrent stdio server backed by the same tool handlers"""
+    return ConcurrentStdioServer(
+        list_tools,
+        call_tool,
+        server_name="k-beauty-complete",
+        server_version="3.0.0",
+        max_concurrency=max_concurrency,
+    )
+
+async def main():
+    """Main function"""
+    KNOWLEDGE.start_watching()
+    try:
+        # KBEAUTY_STDIO_MODE=sequential 이면 기존 MCP 라이브러리 서버 사용
+        if os.environ.get("KBEAUTY_STDIO_MODE", "concurrent") == "sequential":
+            await run_sequential()
+        else:
+            max_concurrency = int(os.environ.get("KBEAUTY_STDIO_CONCURRENCY", "16"))
+            await create_concurrent_server(max_concurrency).serve_stdio()
+    finally:
+        KNOWLEDGE.stop_watching()
+        if _profile_store is not None:
+            await _profile_store.close()
+
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     asyncio.run(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+K-Beauty Startup Report
+Per-phase startup timings against a budget, and the readiness flag behind /ready
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("k-beauty-mcp")
+
+
+def _process_age() -> float:
+    """Seconds since this process was exec'd (falls back to 0 off Linux)"""
+    try:
+        with open("/proc/self/stat") as f:
+            # comm 필드에 공백이 있을 수 있으므로 마지막 ')' 뒤부터 셈
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+class StartupReport:
+    """Collects how long each startup phase took, from process start to ready
+
+    A forked worker (gunicorn ``preload_app``, including respawns) starts a
+    fresh report at fork time; the time the master spent before forking is
+    kept as ``preloaded_ms``.
+    """
+
+    def __init__(self, budget_ms: float):
+        self.budget_ms = budget_ms
+        # 인터프리터 기동과 이 모듈 이전의 import 시간도 포함
+        self.started = time.monotonic() - _process_age()
+        self._last = self.started
+        self.phases: List[Tuple[str, float]] = []
+        self.ready_ms = 0.0
+        self.preloaded_ms: Optional[float] = None
+        self.error: Optional[str] = None
+        self._ready = threading.Event()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self) -> None:
+        # 워커의 준비 시간은 fork 시점부터 셈 (마스터 가동 시간이 섞이지 않게)
+        now = time.monotonic()
+        self.preloaded_ms = (now - self.started) * 1000
+        self.started = self._last = now
+        self.phases = []
+        self.ready_ms = 0.0
+        self.error = None
+        self._ready = threading.Event()
+
+    def mark(self, name: str) -> None:
+        """End the phase called ``name`` (it began at the previous mark or process start)"""
+        now = time.monotonic()
+        self.phases.append((name, (now - self._last) * 1000))
+        self._last = now
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def elapsed_ms(self) -> float:
+        return (time.monotonic() - self.started) * 1000
+
+    def mark_failed(self, error: BaseException) -> None:
+        """Record a failed startup step; the process then never reports ready"""
+        self.error = f"{type(error).__name__}: {error}"
+
+    def mark_ready(self) -> None:
+        """Record time-to-ready and log the phase breakdown (warns when over budget)"""
+        if self._ready.is_set() or self.error is not None:
+            return
+        self.ready_ms = self.elapsed_ms()
+        self._ready.set()
+        breakdown = ", ".join(f"{name}={ms:.0f}ms" for name, ms in self.phases)
+        if self.ready_ms > self.budget_ms:
+            logger.warning("Startup took %.0fms, over the %.0fms budget (%s)",
+                           self.ready_ms, self.budget_ms, breakdown)
+        else:
+            logger.info("Ready in %.0fms of %.0fms budget (%s)", self.ready_ms, self.budget_ms, breakdown)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "ready_ms": round(self.ready_ms, 1) if self.ready else None,
+            "elapsed_ms": round(self.elapsed_ms(), 1),
+            "budget_ms": self.budget_ms,
+            "over_budget": (self.ready_ms if self.ready else self.elapsed_ms()) > self.budget_ms,
+            "phases": {name: round(ms, 1) for name, ms in self.phases},
+            "preloaded_ms": round(self.preloaded_ms, 1) if self.preloaded_ms is not None else None,
+            "error": self.error,
+        }
+
+
+STARTUP = StartupReport(float(os.environ.get("KBEAUTY_STARTUP_BUDGET_MS", "2000")))
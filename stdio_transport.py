@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+K-Beauty Concurrent stdio Transport
+Newline-delimited JSON-RPC over stdio with concurrent, cancellable tool calls
+"""
+
+import asyncio
+import json
+import sys
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from deadlines import REQUEST_TIMEOUT, DeadlineExceeded, request_timeout, run_request
+from rpc_session import RpcSession, error_response
+
+SUPPORTED_PROTOCOL_VERSIONS = ("2024-11-05", "2025-03-26", "2025-06-18")
+# _dispatch가 처리하는 메서드 (그 밖은 -32601)
+METHODS = ("tools/call", "tools/list", "initialize", "ping")
+LATEST_PROTOCOL_VERSION = SUPPORTED_PROTOCOL_VERSIONS[-1]
+
+ReadLine = Callable[[], Awaitable[bytes]]
+WriteLine = Callable[[bytes], Awaitable[None]]
+
+
+def _dump(content: Any) -> Any:
+    """Serialize MCP pydantic models (Tool, TextContent, ...) to JSON-ready dicts"""
+    if hasattr(content, "model_dump"):
+        return content.model_dump(mode="json", by_alias=True, exclude_none=True)
+    return content
+
+
+class ConcurrentStdioServer(RpcSession):
+    """Runs independent requests concurrently and replies as each finishes
+
+    At most ``max_concurrency`` requests run at once and up to
+    ``max_pending`` may be queued or running; beyond that the reader stops
+    pulling lines, so stdin provides backpressure (see ``RpcSession``).
+    """
+
+    def __init__(self, list_tools: Callable[[], Awaitable[Iterable[Any]]],
+                 call_tool: Callable[[str, Dict[str, Any]], Awaitable[Iterable[Any]]],
+                 server_name: str, server_version: str, max_concurrency: int = 16,
+                 max_pending: Optional[int] = None):
+        super().__init__(max_concurrency, max_pending)
+        self.list_tools = list_tools
+        self.call_tool = call_tool
+        self.server_name = server_name
+        self.server_version = server_version
+        self.max_concurrency = max_concurrency
+
+    # ---- 메시지 처리 ----
+
+    async def _dispatch(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        if method == "tools/call":
+            try:
+                content = await self.call_tool(params.get("name"), params.get("arguments") or {})
+            except (asyncio.CancelledError, DeadlineExceeded):
+                raise
+            except Exception as e:
+                return {"content": [{"type": "text", "text": str(e)}], "isError": True}
+            return {"content": [_dump(item) for item in content], "isError": False}
+
+        if method == "tools/list":
+            return {"tools": [_dump(tool) for tool in await self.list_tools()]}
+
+        if method == "initialize":
+            requested = params.get("protocolVersion")
+            return {
+                "protocolVersion": requested if requested in SUPPORTED_PROTOCOL_VERSIONS
+                else LATEST_PROTOCOL_VERSION,
+                "capabilities": {"tools": {}},
+                "serverInfo": {"name": self.server_name, "version": self.server_version},
+            }
+
+        if method == "ping":
+            return {}
+
+        # _respond가 METHODS로 걸러내므로 도달하지 않음
+        raise RuntimeError(f"no handler for {method}")
+
+    async def _respond(self, write_line: WriteLine, message: Dict[str, Any]) -> None:
+        request_id = message.get("id")
+        method = message.get("method", "")
+        params = message.get("params") or {}
+        # 클라이언트가 params._meta.timeout(초)으로 요청 데드라인을 지정할 수 있음
+        meta = params.get("_meta") if isinstance(params.get("_meta"), dict) else {}
+        # 메서드는 먼저 확인 - 핸들러 안의 KeyError 등이 -32601로 보이지 않게
+        if method not in METHODS:
+            await self._write(write_line, error_response(request_id, -32601, f"Method not found: {method}"))
+            return
+        # 취소(CancelledError)는 RpcSession이 처리 - 응답을 보내지 않음
+        try:
+            async with self._running:
+                result = await run_request(method, request_timeout(meta.get("timeout")),
+                                           lambda: self._dispatch(method, params))
+            response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+        except DeadlineExceeded as e:
+            response = error_response(request_id, REQUEST_TIMEOUT, f"Request timed out: {e}")
+        except Exception as e:
+            response = error_response(request_id, -32603, f"Internal error: {str(e)}")
+        await self._write(write_line, response)
+
+    async def _write(self, write_line: WriteLine, response: Dict[str, Any]) -> None:
+        data = json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n"
+        async with self._write_lock:
+            await write_line(data)
+
+    async def serve(self, read_line: ReadLine, write_line: WriteLine) -> None:
+        """Serve until ``read_line`` returns b"" (EOF), then wait for in-flight work"""
+        self._open()
+
+        async def respond(message: Dict[str, Any]) -> None:
+            await self._respond(write_line, message)
+
+        async def reply(response: Dict[str, Any]) -> None:
+            await self._write(write_line, response)
+
+        while True:
+            line = await read_line()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            try:
+                message = json.loads(line)
+            except ValueError as e:
+                await reply(error_response(None, -32700, f"Parse error: {str(e)}"))
+                continue
+            # 응답 메시지는 무시 (서버 -> 클라이언트 요청을 보내지 않음)
+            await self.accept(message, respond, reply)
+
+        await self.drain()
+
+    async def serve_stdio(self) -> None:
+        """Serve over the process stdin/stdout"""
+        stdin = sys.stdin.buffer
+        stdout = sys.stdout.buffer
+
+        async def read_line() -> bytes:
+            return await asyncio.to_thread(stdin.readline)
+
+        async def write_line(data: bytes) -> None:
+            stdout.write(data)
+            stdout.flush()
+
+        await self.serve(read_line, write_line)
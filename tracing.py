@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+K-Beauty Tracing
+Lightweight spans with a ring buffer and a background OTLP/JSON file exporter
+"""
+
+import contextvars
+import json
+import os
+import random
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from buffered_writer import BufferedWriter
+
+SERVICE_NAME = "k-beauty-mcp"
+
+# OTLP span kind / status code
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+STATUS_UNSET = 0
+STATUS_ERROR = 2
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "kbeauty_current_span", default=None
+)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Span:
+    """A timed operation; only sampled traces create Span objects"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "kind",
+                 "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], kind: int):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = "%016x" % random.getrandbits(64)
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)}
+                           for key, value in self.attributes.items()],
+            "status": {"code": STATUS_UNSET},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.error is not None:
+            span["status"] = {"code": STATUS_ERROR, "message": self.error}
+        return span
+
+
+class _NoopSpan:
+    """Returned for unsampled traces so call sites never branch"""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def _reset(token: contextvars.Token) -> None:
+    # 스트리밍 제너레이터가 다른 컨텍스트에서 종료될 때는 토큰을 되돌릴 수 없음
+    try:
+        _current_span.reset(token)
+    except ValueError:
+        pass
+
+# 샘플링되지 않은 트레이스의 하위 스팬도 건너뛰기 위한 표식
+_UNSAMPLED = object()
+
+
+class Tracer:
+    """Creates spans and hands finished ones to a non-blocking file exporter
+
+    Finished spans go into a bounded buffer; when it is full new spans are
+    dropped (and counted) rather than blocking the request path. A daemon
+    thread (``BufferedWriter``) drains the buffer in batches and appends one
+    OTLP/JSON ``resourceSpans`` document per line to
+    ``<directory>/spans-<pid>.jsonl``.
+    """
+
+    def __init__(self, directory: Optional[str] = None, sample_rate: float = 1.0,
+                 buffer_size: int = 8192, batch_size: int = 512,
+                 export_interval: float = 1.0):
+        self.directory = directory
+        self.sample_rate = sample_rate if directory else 0.0
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.export_interval = export_interval
+        self._writer: BufferedWriter[Span] = BufferedWriter(
+            self._export, "span-exporter", buffer_size, batch_size, export_interval,
+            prepare=lambda: os.makedirs(self.directory, exist_ok=True),
+        )
+
+    @property
+    def dropped(self) -> int:
+        return self._writer.dropped
+
+    @property
+    def exported(self) -> int:
+        return self._writer.written
+
+    @classmethod
+    def from_env(cls) -> "Tracer":
+        """Configure from KBEAUTY_TRACE_DIR / KBEAUTY_TRACE_SAMPLE_RATE (off if no directory)"""
+        return cls(
+            directory=os.environ.get("KBEAUTY_TRACE_DIR") or None,
+            sample_rate=float(os.environ.get("KBEAUTY_TRACE_SAMPLE_RATE", "1.0")),
+            buffer_size=int(os.environ.get("KBEAUTY_TRACE_BUFFER", "8192")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0.0
+
+    @contextmanager
+    def span(self, name: str, kind: int = SPAN_KIND_INTERNAL, **attributes: Any) -> Iterator[Any]:
+        """Time a block as a child of the current span (root spans are sampled)"""
+        parent = _current_span.get()
+        if parent is _UNSAMPLED or not self.enabled:
+            yield NOOP_SPAN
+            return
+        if parent is None and random.random() >= self.sample_rate:
+            token = _current_span.set(_UNSAMPLED)
+            try:
+                yield NOOP_SPAN
+            finally:
+                _reset(token)
+            return
+
+        if parent is None:
+            span = Span(name, "%032x" % random.getrandbits(128), None, kind)
+        else:
+            span = Span(name, parent.trace_id, parent.span_id, kind)
+        span.attributes.update(attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.error = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            _reset(token)
+            span.end_ns = time.time_ns()
+            self._enqueue(span)
+
+    def _enqueue(self, span: Span) -> None:
+        self._writer.put(span)
+
+    def export_pending(self) -> None:
+        """Write every buffered span (called by the exporter thread, or at shutdown)"""
+        if self.directory:
+            self._writer.flush()
+
+    def _export(self, batch: List[Span]) -> None:
+        # pid별 파일 - fork된 워커마다 따로 씀
+        path = os.path.join(self.directory, f"spans-{os.getpid()}.jsonl")
+        document = {
+            "resourceSpans": [{
+                "resource": {"attributes": [
+                    {"key": "service.name", "value": {"stringValue": SERVICE_NAME}},
+                    {"key": "process.pid", "value": {"intValue": str(os.getpid())}},
+                ]},
+                "scopeSpans": [{
+                    "scope": {"name": SERVICE_NAME},
+                    "spans": [span.to_otlp() for span in batch],
+                }],
+            }]
+        }
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(document, ensure_ascii=False) + "\n")
+
+
+tracer = Tracer.from_env()
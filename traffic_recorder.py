@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+K-Beauty Traffic Recorder
+Sampled, anonymized JSON-RPC request capture to JSONL for replay load tests
+"""
+
+import hashlib
+import hmac
+import json
+import math
+import os
+import random
+import re
+import time
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional
+
+from buffered_writer import BufferedWriter
+from trend_analytics import normalize_term
+
+# 원문 그대로 남기는 JSON-RPC 메서드 (그 밖의 메서드 이름은 길이만 남김)
+RECORDED_METHODS = {"initialize", "tools/list", "tools/call", "ping"}
+# 사용자 식별자는 같은 값이 같은 토큰이 되도록 키 있는 해시로 대체
+PSEUDONYMIZED_FIELDS = {"profile_id"}
+# 숫자는 구간 단위로 뭉갬 (그 밖의 숫자는 0으로)
+BUCKETED_FIELDS = {"user_age": 10, "max_price": 1000}
+# 알려진 용어(트렌드 어휘)일 때만 정규화해 남기는 필드 -> 어휘 범주
+VOCABULARY_FIELDS = {
+    "brand_name": "brands",
+    "ingredients": "ingredients",
+    "products": "products",
+    "target_product": "products",
+    "concerns": "concerns",
+    "skin_concerns": "concerns",
+}
+# 필드 이름처럼 보이지 않는 키는 그 자체가 입력일 수 있으므로 해시로 대체
+_FIELD_NAME = re.compile(r"[A-Za-z_][A-Za-z0-9_]{0,63}")
+
+
+def _redact(value: str) -> str:
+    return "x" * len(value)
+
+
+def schema_enums(tools: Iterable[Dict[str, Any]]) -> Dict[str, FrozenSet[str]]:
+    """Allowed values per argument name, from the ``enum``s in the tools' input schemas"""
+    allowed: Dict[str, set] = {}
+    for tool in tools:
+        for name, schema in tool.get("inputSchema", {}).get("properties", {}).items():
+            enum = schema.get("enum") or (schema.get("items") or {}).get("enum")
+            if enum:
+                allowed.setdefault(name, set()).update(enum)
+    return {name: frozenset(values) for name, values in allowed.items()}
+
+
+class TrafficRecorder:
+    """Non-blocking request capture with a background JSONL writer
+
+    ``record`` samples, anonymizes and hands lines to a ``BufferedWriter``
+    (dropped when its buffer is full, never blocking a request) that
+    appends them to ``path``. Each line is
+    ``{"ts": <unix seconds>, "transport": ..., "method": ..., "params": ...}``.
+    Request ids, headers and client addresses are never recorded.
+
+    Of ``params`` only the tool ``name`` (if in ``tool_names``) and the
+    ``arguments`` are kept; ``_meta``, ``clientInfo`` and any other keys
+    are dropped. Arguments are kept only where they are known to be safe:
+    values from ``allowed_values`` (schema enums) and, for
+    ``VOCABULARY_FIELDS``, terms ``is_known(category, term)`` accepts.
+    Every other string is redacted to its length, at any depth of nested
+    lists and objects.
+    """
+
+    def __init__(self, path: Optional[str] = None, sample_rate: float = 1.0,
+                 buffer_size: int = 8192, flush_interval: float = 1.0,
+                 salt: Optional[str] = None,
+                 allowed_values: Optional[Dict[str, FrozenSet[str]]] = None,
+                 is_known: Optional[Callable[[str, str], bool]] = None,
+                 tool_names: Iterable[str] = ()):
+        self.path = path
+        self.sample_rate = sample_rate if path else 0.0
+        self.salt = (salt or os.urandom(16).hex()).encode("utf-8")
+        self.allowed_values = allowed_values or {}
+        self.is_known = is_known
+        self.tool_names = frozenset(tool_names)
+        # 한 번의 write로 버퍼 전체를 붙여 씀
+        self._writer: BufferedWriter[str] = BufferedWriter(
+            self._append, "traffic-recorder", buffer_size, buffer_size, flush_interval,
+            prepare=lambda: os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True),
+        )
+
+    @classmethod
+    def from_env(cls, **options: Any) -> "TrafficRecorder":
+        """Configure from KBEAUTY_RECORD_PATH / KBEAUTY_RECORD_SAMPLE_RATE (off if no path)"""
+        return cls(
+            path=os.environ.get("KBEAUTY_RECORD_PATH") or None,
+            sample_rate=float(os.environ.get("KBEAUTY_RECORD_SAMPLE_RATE", "1.0")),
+            buffer_size=int(os.environ.get("KBEAUTY_RECORD_BUFFER", "8192")),
+            salt=os.environ.get("KBEAUTY_RECORD_SALT") or None,
+            **options,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0.0
+
+    @property
+    def recorded(self) -> int:
+        return self._writer.written
+
+    @property
+    def dropped(self) -> int:
+        return self._writer.dropped
+
+    def pseudonym(self, value: Any) -> str:
+        digest = hmac.new(self.salt, str(value).encode("utf-8"), hashlib.sha256).hexdigest()
+        return "anon-" + digest[:16]
+
+    def anonymize_arguments(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            key if _FIELD_NAME.fullmatch(key) else self.pseudonym(key): self._anonymize(key, value)
+            for key, value in arguments.items()
+        }
+
+    def _anonymize(self, key: str, value: Any) -> Any:
+        # 리스트 원소는 필드 규칙을 그대로 따르고, 중첩 객체는 자체 키로 다시 검사
+        if isinstance(value, list):
+            return [self._anonymize(key, item) for item in value]
+        if isinstance(value, dict):
+            return self.anonymize_arguments(value)
+        if value is None or isinstance(value, bool) or value == "":
+            return value
+        if key in PSEUDONYMIZED_FIELDS:
+            return self.pseudonym(value)
+        if isinstance(value, (int, float)):
+            # json.loads는 NaN/Infinity도 받아들임
+            if not math.isfinite(value):
+                return None
+            size = BUCKETED_FIELDS.get(key)
+            return int(value) // size * size if size else 0
+        if not isinstance(value, str):
+            return None
+        if value in self.allowed_values.get(key, ()):
+            return value
+        category = VOCABULARY_FIELDS.get(key)
+        if category is not None and self.is_known is not None:
+            term = normalize_term(value)
+            if term and self.is_known(category, term):
+                return term
+        return _redact(value)
+
+    def record(self, method: str, params: Optional[Dict[str, Any]], transport: str = "http") -> None:
+        """Queue one request for capture (sampled; never blocks or raises)"""
+        if not self.enabled or (self.sample_rate < 1.0 and random.random() >= self.sample_rate):
+            return
+        if self._writer.full:
+            self._writer.dropped += 1
+            return
+        # 기록 실패가 요청 처리에 영향을 주지 않도록 모든 오류는 버린 건수로만 셈
+        try:
+            line = json.dumps({"ts": round(time.time(), 6), "transport": transport,
+                               "method": self._method(method), "params": self._params(params)},
+                              ensure_ascii=False, allow_nan=False)
+        except Exception:
+            self._writer.dropped += 1
+            return
+        self._writer.put(line)
+
+    def _method(self, method: Any) -> Any:
+        if method in RECORDED_METHODS:
+            return method
+        return _redact(method) if isinstance(method, str) else None
+
+    def _params(self, params: Any) -> Dict[str, Any]:
+        """Recorded subset of ``params``: tool ``name`` and anonymized ``arguments``"""
+        if not isinstance(params, dict):
+            return {}
+        recorded: Dict[str, Any] = {}
+        name = params.get("name")
+        if name is not None:
+            recorded["name"] = name if name in self.tool_names else self._anonymize("name", name)
+        arguments = params.get("arguments")
+        if isinstance(arguments, dict):
+            recorded["arguments"] = self.anonymize_arguments(arguments)
+        return recorded
+
+    def flush(self) -> None:
+        """Append every buffered line to the recording"""
+        if self.path:
+            self._writer.flush()
+
+    def _append(self, lines: List[str]) -> None:
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+        # 워커 여러 개가 같은 파일에 써도 O_APPEND 단일 write라 줄이 섞이지 않음
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            written = os.write(fd, data)
+            while written < len(data):
+                written += os.write(fd, data[written:])
+        finally:
+            os.close(fd)
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+K-Beauty Traffic Trend Analytics
+Streaming heavy-hitter sketches (count-min + top-k) over time windows
+"""
+
+import re
+import time
+from array import array
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+_MASK32 = 0xFFFFFFFF
+
+# tools/call 인자 -> 트렌드 카테고리
+ARGUMENT_CATEGORIES = {
+    "brand_name": "brands",
+    "ingredients": "ingredients",
+    "concerns": "concerns",
+    "skin_concerns": "concerns",
+    "products": "products",
+    "target_product": "products",
+}
+
+CATEGORIES = ("brands", "ingredients", "concerns", "products")
+
+# 한 번의 호출이 스케치 비용을 키우지 않도록 제한
+MAX_ITEMS_PER_ARGUMENT = 20
+MAX_ITEM_LENGTH = 64
+
+# 응답에 그대로 출력되므로 마크다운/링크/지시문에 쓰이는 문자는 제거
+_UNSAFE_CHARS = re.compile(r"[^\w\s\-'&.+%]|_")
+
+
+def normalize_term(value: Any) -> Optional[str]:
+    """Canonical form of a trend item: markdown-safe, single-spaced, lower case"""
+    if not isinstance(value, str):
+        return None
+    value = " ".join(_UNSAFE_CHARS.sub(" ", value).split()).lower()[:MAX_ITEM_LENGTH]
+    return value or None
+
+
+class CountMinSketch:
+    """Count-min sketch with conservative update"""
+
+    __slots__ = ("width", "depth", "_rows")
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self._rows = [array("I", bytes(4 * width)) for _ in range(depth)]
+
+    def _indexes(self, item: str) -> List[int]:
+        h = hash(item)
+        h1 = h & _MASK32
+        h2 = ((h >> 32) & _MASK32) | 1
+        width = self.width
+        return [(h1 + i * h2) % width for i in range(self.depth)]
+
+    def add(self, item: str, count: int = 1) -> int:
+        """Add ``count`` occurrences and return the new estimate"""
+        indexes = self._indexes(item)
+        rows = self._rows
+        estimate = min(row[i] for row, i in zip(rows, indexes)) + count
+        for row, i in zip(rows, indexes):
+            if row[i] < estimate:
+                row[i] = estimate
+        return estimate
+
+    def estimate(self, item: str) -> int:
+        return min(row[i] for row, i in zip(self._rows, self._indexes(item)))
+
+    def clear(self) -> None:
+        for row in self._rows:
+            row[:] = array("I", bytes(4 * self.width))
+
+    @property
+    def nbytes(self) -> int:
+        return sum(row.itemsize * len(row) for row in self._rows)
+
+
+class TopK:
+    """Bounded heavy-hitter candidates keyed by sketch estimates
+
+    Each candidate also keeps up to ``max_clients`` distinct client hashes,
+    enough to tell whether an item is requested by several clients.
+    """
+
+    __slots__ = ("k", "max_clients", "counts", "clients", "_floor")
+
+    def __init__(self, k: int = 32, max_clients: int = 3):
+        self.k = k
+        self.max_clients = max_clients
+        self.counts: Dict[str, int] = {}
+        self.clients: Dict[str, Set[int]] = {}
+        # 추정치는 증가만 하므로 floor는 실제 최솟값의 하한으로 유지해도 안전
+        self._floor = 0
+
+    def offer(self, item: str, estimate: int, client: int = 0) -> None:
+        counts = self.counts
+        if item in counts or len(counts) < self.k:
+            counts[item] = estimate
+            self._add_client(item, client)
+            return
+        if estimate <= self._floor:
+            return
+        weakest = min(counts, key=counts.get)
+        if estimate > counts[weakest]:
+            del counts[weakest]
+            self.clients.pop(weakest, None)
+            counts[item] = estimate
+            self._add_client(item, client)
+        self._floor = min(counts.values())
+
+    def _add_client(self, item: str, client: int) -> None:
+        clients = self.clients.setdefault(item, set())
+        if len(clients) < self.max_clients:
+            clients.add(client)
+
+    def clear(self) -> None:
+        self.counts.clear()
+        self.clients.clear()
+        self._floor = 0
+
+
+class _Window:
+    __slots__ = ("window_id", "events", "sketches", "tops")
+
+    def __init__(self, width: int, depth: int, top_k: int, min_clients: int):
+        self.window_id = -1
+        self.events = 0
+        self.sketches = {category: CountMinSketch(width, depth) for category in CATEGORIES}
+        self.tops = {category: TopK(top_k, min_clients) for category in CATEGORIES}
+
+    def reset(self, window_id: int) -> None:
+        self.window_id = window_id
+        self.events = 0
+        for sketch in self.sketches.values():
+            sketch.clear()
+        for top in self.tops.values():
+            top.clear()
+
+
+class TrendTracker:
+    """Per-window heavy hitters for brands, ingredients, concerns and products
+
+    Memory is fixed by ``windows`` x sketch size x ``top_k``; raw requests
+    are never kept. With the defaults (1 day windows, 14 windows) the
+    current week can be compared with the previous one.
+
+    Items are shown to every client, so only terms accepted by
+    ``is_known(category, item)`` are counted, and ``top``/``rising`` only
+    return items requested by at least ``min_clients`` distinct clients.
+    """
+
+    def __init__(self, window_seconds: int = 86400, windows: int = 14,
+                 width: int = 2048, depth: int = 4, top_k: int = 32,
+                 min_clients: int = 3,
+                 is_known: Optional[Callable[[str, str], bool]] = None,
+                 clock: Callable[[], float] = time.time):
+        self.window_seconds = window_seconds
+        self.min_clients = min_clients
+        self.is_known = is_known
+        self.clock = clock
+        self._windows = [_Window(width, depth, top_k, min_clients) for _ in range(windows)]
+
+    def _window_id(self, now: Optional[float]) -> int:
+        return int((self.clock() if now is None else now) // self.window_seconds)
+
+    def _window(self, window_id: int) -> _Window:
+        window = self._windows[window_id % len(self._windows)]
+        if window.window_id != window_id:
+            window.reset(window_id)
+        return window
+
+    def record(self, category: str, items: Iterable[Any], now: Optional[float] = None,
+               client: Optional[str] = None) -> None:
+        """Count items for one category in the current window"""
+        self._record(self._window(self._window_id(now)), category, items, hash(client))
+
+    def _record(self, window: _Window, category: str, items: Iterable[Any], client: int) -> None:
+        sketch = window.sketches[category]
+        top = window.tops[category]
+        is_known = self.is_known
+        for count, value in enumerate(items):
+            if count >= MAX_ITEMS_PER_ARGUMENT:
+                break
+            item = normalize_term(value)
+            if item is not None and (is_known is None or is_known(category, item)):
+                top.offer(item, sketch.add(item), client)
+
+    def observe(self, arguments: Dict[str, Any], now: Optional[float] = None,
+                client: Optional[str] = None) -> None:
+        """Feed the trend-relevant arguments of one tools/call from ``client``"""
+        if not isinstance(arguments, dict):
+            return
+        window = self._window(self._window_id(now))
+        window.events += 1
+        client_hash = hash(client)
+        for argument, category in ARGUMENT_CATEGORIES.items():
+            value = arguments.get(argument)
+            if isinstance(value, str):
+                self._record(window, category, (value,), client_hash)
+            elif isinstance(value, list):
+                self._record(window, category, value, client_hash)
+
+    def _period(self, now: Optional[float], period_windows: int, offset: int = 0) -> List[_Window]:
+        current = self._window_id(now) - offset
+        ids = range(current - period_windows + 1, current + 1)
+        return [window for window in self._windows if window.window_id in ids]
+
+    def event_count(self, period_windows: int = 7, now: Optional[float] = None) -> int:
+        return sum(window.events for window in self._period(now, period_windows))
+
+    def _estimate(self, windows: List[_Window], category: str, item: str) -> int:
+        return sum(window.sketches[category].estimate(item) for window in windows)
+
+    def _candidates(self, windows: List[_Window], category: str) -> Set[str]:
+        """Top-k items seen from at least ``min_clients`` distinct clients"""
+        clients: Dict[str, Set[int]] = {}
+        for window in windows:
+            top = window.tops[category]
+            for item in top.counts:
+                clients.setdefault(item, set()).update(top.clients.get(item, ()))
+        return {item for item, seen in clients.items() if len(seen) >= self.min_clients}
+
+    def top(self, category: str, period_windows: int = 7, limit: int = 5,
+            min_count: int = 3, now: Optional[float] = None) -> List[Tuple[str, int]]:
+        """Most requested items in the last ``period_windows`` windows"""
+        windows = self._period(now, period_windows)
+        ranked = sorted(((item, self._estimate(windows, category, item))
+                         for item in self._candidates(windows, category)),
+                        key=lambda entry: entry[1], reverse=True)
+        return [(item, count) for item, count in ranked if count >= min_count][:limit]
+
+    def rising(self, category: str, period_windows: int = 7, limit: int = 5,
+               min_count: int = 3, now: Optional[float] = None) -> List[Tuple[str, int, int]]:
+        """Items growing fastest versus the previous period: (item, current, previous)"""
+        current = self._period(now, period_windows)
+        previous = self._period(now, period_windows, offset=period_windows)
+
+        scored = []
+        for item in self._candidates(current, category):
+            count = self._estimate(current, category, item)
+            before = self._estimate(previous, category, item)
+            if count >= min_count and count > before:
+                scored.append(((count + 1) / (before + 1), item, count, before))
+        scored.sort(reverse=True)
+        return [(item, count, before) for _score, item, count, before in scored[:limit]]
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate sketch memory (counters only)"""
+        return sum(sketch.nbytes for window in self._windows for sketch in window.sketches.values())
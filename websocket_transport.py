@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+K-Beauty WebSocket Transport
+JSON-RPC over one long-lived WebSocket with concurrent calls multiplexed by id
+"""
+
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+from rpc_session import RpcSession, error_response
+
+logger = logging.getLogger("k-beauty-mcp.websocket")
+
+# RFC 6455 close code: message too big
+CLOSE_MESSAGE_TOO_BIG = 1009
+
+Receive = Callable[[], Awaitable[Optional[Union[str, bytes]]]]
+Send = Callable[[str], Awaitable[None]]
+Dispatch = Callable[[Dict[str, Any]], Awaitable[str]]
+
+
+class MessageTooLarge(Exception):
+    """A frame exceeded the per-connection message size limit"""
+
+    def __init__(self, size: int, limit: int):
+        super().__init__(f"message of {size} bytes exceeds the {limit} byte limit")
+        self.size = size
+        self.limit = limit
+
+
+class WebSocketSession(RpcSession):
+    """Serves one connection: each request runs as its own task, replies go out as they finish
+
+    At most ``max_in_flight`` requests are dispatched at once and up to
+    ``max_pending`` may be queued or running; beyond that the session stops
+    reading frames, so a client that floods (or stops reading replies)
+    is slowed by TCP backpressure instead of growing server memory
+    (see ``RpcSession``).
+    """
+
+    def __init__(self, dispatch: Dispatch, max_in_flight: int = 32,
+                 max_pending: Optional[int] = None, max_message_bytes: int = 1024 * 1024):
+        super().__init__(max_in_flight, max_pending)
+        self.dispatch = dispatch
+        self.max_message_bytes = max_message_bytes
+        self.closed = False
+
+    def _check_size(self, data: Union[str, bytes]) -> None:
+        size = len(data)
+        # 문자열은 UTF-8로 최대 4배 - 확실히 작으면 인코딩하지 않음
+        if isinstance(data, str) and size * 4 > self.max_message_bytes:
+            size = len(data.encode("utf-8"))
+        if size > self.max_message_bytes:
+            raise MessageTooLarge(size, self.max_message_bytes)
+
+    async def _send(self, send: Send, text: str) -> None:
+        if self.closed:
+            return
+        try:
+            async with self._write_lock:
+                await send(text)
+        except Exception as e:
+            # 클라이언트가 이미 끊긴 경우 - 나머지 요청도 곧 취소됨
+            logger.debug("send failed, closing session: %s", e)
+            self.closed = True
+
+    async def _respond(self, send: Send, message: Dict[str, Any]) -> None:
+        async with self._running:
+            text = await self.dispatch(message)
+        await self._send(send, text)
+
+    async def serve(self, receive: Receive, send: Send) -> None:
+        """Serve until ``receive`` returns None (disconnect); raises MessageTooLarge"""
+        self._open()
+
+        async def respond(message: Dict[str, Any]) -> None:
+            await self._respond(send, message)
+
+        async def reply(response: Dict[str, Any]) -> None:
+            await self._send(send, json.dumps(response, ensure_ascii=False))
+
+        try:
+            while not self.closed:
+                data = await receive()
+                if data is None:
+                    break
+                self._check_size(data)
+                try:
+                    message = json.loads(data)
+                except ValueError as e:
+                    await reply(error_response(None, -32700, f"Parse error: {str(e)}"))
+                    continue
+                await self.accept(message, respond, reply)
+        finally:
+            # 연결이 끊기면 남은 작업은 결과를 보낼 곳이 없으므로 취소
+            self.cancel_all()